@@ -1,3 +1,4 @@
+import importlib.util
 import json
 from logging import warning
 import os
@@ -7,7 +8,85 @@ from typing import Dict, List, NotRequired, Union, TypedDict
 
 from .lib.songs import ALL_SONGS
 from .lib.navigators import navigators
-from .lib.paths import manual_data_path
+from .lib.paths import manual_data_path, manual_src_path
+
+
+def load_src_module(name: str, path: Path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def save_tables_bundle():
+    """Precompile the data tables into src/data/tables.bundle, src/data/datapackage.index and src/data/locations.shards,
+    which the world loads instead of the json files"""
+    bundle_lib = load_src_module("manual_bundle", manual_src_path("Bundle.py"))
+    templates = load_src_module("manual_templates", manual_src_path("Templates.py"))
+    categories = load_src_module("manual_categories", manual_src_path("Categories.py"))
+    bundle_path = manual_src_path(bundle_lib.BUNDLE_FILE)
+    index_path = manual_src_path(bundle_lib.INDEX_FILE)
+    shards_path = manual_src_path(bundle_lib.SHARDS_FILE)
+
+    try:
+        hooks = load_src_module("manual_data_hooks", manual_src_path("hooks", "Data.py"))
+    except Exception as error:
+        # the world can still load the json files, it just won't get the faster startup
+        warning(f"Skipping the tables bundle, hooks/Data.py can't be loaded outside of Archipelago: {error}")
+        bundle_path.unlink(missing_ok=True)
+        index_path.unlink(missing_ok=True)
+        shards_path.unlink(missing_ok=True)
+        return
+
+    def read_file(path: str) -> bytes | None:
+        file_path = manual_src_path(path)
+        return file_path.read_bytes() if file_path.is_file() else None
+
+    def load_file(filename: str):
+        data = read_file(f"data/{filename}")
+        return json.loads(data) if data else []
+
+    locations = load_file("locations.json")
+    data_sources = templates.get_template_sources(locations.get("data", []) if isinstance(locations, dict) else locations)
+
+    tables = bundle_lib.load_tables(load_file, hooks, templates)
+    id_map = load_file(bundle_lib.ID_MAP_FILE)
+    bundle = bundle_lib.compile_bundle(tables, bundle_lib.source_hash(read_file, data_sources), data_sources, id_map)
+    index_path.write_bytes(bundle_lib.write_bundle(bundle_lib.compile_index(bundle, categories.is_exported_name_group)))
+
+    if hasattr(hooks, "get_location_shard_key"):
+        shards_path.write_bytes(bundle_lib.split_location_shards(bundle, hooks.get_location_shard_key))
+    else:
+        shards_path.unlink(missing_ok=True)
+    bundle_path.write_bytes(bundle_lib.write_bundle(bundle))
+
+
+def save_id_map(json_dump_args: dict):
+    """Add the new item and location names to src/data/ids.json, so every name keeps its id when songs are added or removed\n
+    The first time, the ids are the ones the names have now, in the order of the tables
+    """
+    bundle_lib = load_src_module("manual_bundle", manual_src_path("Bundle.py"))
+    templates = load_src_module("manual_templates", manual_src_path("Templates.py"))
+
+    def load_file(filename: str):
+        file_path = manual_data_path(filename)
+        return json.loads(file_path.read_text(encoding="utf-8")) if file_path.is_file() else []
+
+    game_table = load_file("game.json")
+    starting_index = bundle_lib.get_starting_index(game_table)
+    item_table = load_file("items.json")
+    location_table = templates.expand_location_templates(load_file("locations.json"), load_file)
+    # prepared without the previous ids, to get the ones of the table order for the names the map doesn't have yet
+    bundle_lib.prepare_item_table(item_table, starting_index, bundle_lib.get_filler_item_name(game_table))
+    bundle_lib.prepare_location_table(location_table, starting_index)
+
+    id_map = load_file(bundle_lib.ID_MAP_FILE) or {}
+    id_map = {
+        "items": bundle_lib.update_id_map(id_map.get("items", {}), item_table),
+        "locations": bundle_lib.update_id_map(id_map.get("locations", {}), location_table),
+    }
+    with open(manual_data_path(bundle_lib.ID_MAP_FILE), "w", encoding="utf-8") as file:
+        json.dump(id_map, file, **json_dump_args)
 
 
 class Item(TypedDict):
@@ -30,8 +109,26 @@ class Location(TypedDict):
     victory: NotRequired[bool]
 
 
+class LocationTemplateInfo(TypedDict):
+    source: str
+    locations: list[dict]
+
+
+class LocationTemplate(TypedDict):
+    template: LocationTemplateInfo
+
+
+class SongGoalRow(TypedDict):
+    identifier: str
+    number: int
+    kind: str
+    navigators: NotRequired[list[str]]
+
+
 class Category(TypedDict):
+    match: NotRequired[str]
     hidden: NotRequired[bool]
+    name_group: NotRequired[bool]
     yaml_option: NotRequired[List[str]]
 
 
@@ -49,7 +146,7 @@ class GameInfo(TypedDict):
     starting_items: list[StartingItemInfo]
 
 
-def song_number_category_for(song_number: int) -> str:
+def song_number_category_for(song_number: int | str) -> str:
     return f"Song Number {song_number}"
 
 
@@ -57,15 +154,74 @@ def navigator_key_category_for(navigator: str) -> str:
     return f"Navigator Access for {navigator}"
 
 
+SONG_GOALS = ["Track Clear", "AA Rank", "AAA Rank"]
+
+
+def song_goal_location_template() -> LocationTemplate:
+    return LocationTemplate(
+        template=LocationTemplateInfo(
+            source="song_goals.json",
+            locations=[
+                {
+                    "where": {"kind": "boss"},
+                    "name": "{identifier}",
+                    "requires": f"{{{{ItemValue(chain:300)}}}} and |@{song_number_category_for('{number}')}|",
+                    "category": ["Goals", "{identifier}", "(Boss) {identifier}"],
+                    "place_item": ["{identifier} (Completion)"],
+                },
+                {
+                    "where": {"kind": "navigator"},
+                    "for_each": {"goal": SONG_GOALS},
+                    "name": "{identifier} ({goal})",
+                    "requires": {
+                        "each": "navigators",
+                        "as": "navigator",
+                        "format": f"|@{navigator_key_category_for('{navigator}')}|",
+                        "join": " or ",
+                    },
+                    "category": [
+                        "Goals",
+                        "{identifier}",
+                        {
+                            "each": "navigators",
+                            "as": "navigator",
+                            "format": "(Song) ({navigator}) {identifier}",
+                        },
+                    ],
+                },
+                {
+                    "where": {"kind": "song"},
+                    "for_each": {"goal": SONG_GOALS},
+                    "name": "{identifier} ({goal})",
+                    "requires": f"|@{song_number_category_for('{number}')}|",
+                    "category": [
+                        "Goals",
+                        "{identifier}",
+                        "(Song) {identifier}",
+                        "(Goal) {goal}",
+                    ],
+                },
+            ],
+        )
+    )
+
+
 class SoundVoltexWorld:
-    locations: list[Location] = []
+    locations: list[Location | LocationTemplate] = []
     items: list[Item] = []
     categories: dict[str, Category] = {}
+    song_goals: list[SongGoalRow] = []
 
     @property
     def item_count(self):
         return sum(item.get("count") or 1 for item in self.items)
 
+    @property
+    def location_count(self):
+        # the song goal template makes one location per boss, and one per goal for every other song
+        song_goal_count = sum(1 if row["kind"] == "boss" else len(SONG_GOALS) for row in self.song_goals)
+        return len(self.locations) - 1 + song_goal_count
+
     def __init__(self) -> None:
         self.locations += [
             Location(
@@ -94,12 +250,20 @@ class SoundVoltexWorld:
             ]
         ]
 
-        self.categories["Goals"] = {"hidden": True}
+        # the per-navigator and per-song categories are only used for logic, so they're hidden (with rules for the
+        # ones named after a number or navigator, see src/Categories.py) and left out of the name groups sent to clients
+        self.categories["Goals"] = Category(hidden=True, name_group=False)
+        self.categories[navigator_key_category_for("*")] = Category(
+            match="glob", hidden=True, name_group=False
+        )
+        self.categories[song_number_category_for("*")] = Category(
+            match="glob", hidden=True, name_group=False
+        )
+        # the song identifiers are listed by name, no pattern tells them apart from every other category
+        for song in ALL_SONGS:
+            self.categories[song.identifier] = Category(hidden=True, name_group=False)
 
         for navigator in navigators:
-            self.categories[navigator_key_category_for(navigator)] = Category(
-                hidden=True
-            )
             self.items += [
                 Item(
                     name=navigator,
@@ -109,18 +273,12 @@ class SoundVoltexWorld:
             ]
 
         for song_number, song in enumerate(ALL_SONGS):
-            self.categories[song.identifier] = Category(hidden=True)
-            self.categories[song_number_category_for(song_number)] = Category(
-                hidden=True
-            )
-
             song_navigators = [
                 navigator
                 for navigator, navigator_songs in navigators.items()
                 if song.title in navigator_songs
             ]
 
-            goals = ["Track Clear", "AA Rank", "AAA Rank"]
             is_boss = any(level >= 20 for level in song.charts.values())
 
             if is_boss:
@@ -141,37 +299,18 @@ class SoundVoltexWorld:
                         category=["Goals", song.identifier, "Boss Clear"],
                     ),
                 ]
-                self.locations += [
-                    Location(
-                        name=song.identifier,
-                        requires=f"{{ItemValue(chain:300)}} and |@{song_number_category_for(song_number)}|",
-                        category=[
-                            "Goals",
-                            song.identifier,
-                            f"(Boss) {song.identifier}",
-                        ],
-                        place_item=[f"{song.identifier} (Completion)"],
-                    )
+                self.song_goals += [
+                    SongGoalRow(identifier=song.identifier, number=song_number, kind="boss")
                 ]
             elif song_navigators:
-                for goal in goals:
-                    self.locations += [
-                        Location(
-                            name=f"{song.identifier} ({goal})",
-                            requires=" or ".join(
-                                f"|@{navigator_key_category_for(navigator)}|"
-                                for navigator in song_navigators
-                            ),
-                            category=[
-                                "Goals",
-                                song.identifier,
-                                *[
-                                    f"(Song) ({navigator}) {song.identifier}"
-                                    for navigator in song_navigators
-                                ],
-                            ],
-                        )
-                    ]
+                self.song_goals += [
+                    SongGoalRow(
+                        identifier=song.identifier,
+                        number=song_number,
+                        kind="navigator",
+                        navigators=song_navigators,
+                    )
+                ]
             else:
                 self.items += [
                     Item(
@@ -184,19 +323,12 @@ class SoundVoltexWorld:
                         ],
                     )
                 ]
-                for goal in goals:
-                    self.locations += [
-                        Location(
-                            name=f"{song.identifier} ({goal})",
-                            requires=f"|@{song_number_category_for(song_number)}|",
-                            category=[
-                                "Goals",
-                                song.identifier,
-                                f"(Song) {song.identifier}",
-                                f"(Goal) {goal}",
-                            ],
-                        )
-                    ]
+                self.song_goals += [
+                    SongGoalRow(identifier=song.identifier, number=song_number, kind="song")
+                ]
+
+        # the song goal locations are expanded from song_goals.json when the world loads (see src/Templates.py)
+        self.locations += [song_goal_location_template()]
 
         # set the current lazer color, which ever came latest
         # they're all traps because any of them could give you awkward combinations,
@@ -362,7 +494,7 @@ if __name__ == "__main__":
     print(f"Creator: {game_info['creator']}")
 
     print(f"Generated {world.item_count} items")
-    print(f"Generated {len(world.locations)} locations")
+    print(f"Generated {world.location_count} locations")
     print(f"Configured {len(world.categories)} categories")
     print(f"World path: {zip_path}")
 
@@ -378,10 +510,20 @@ if __name__ == "__main__":
     with open(manual_data_path("locations.json"), "w", encoding="utf-8") as file:
         json.dump(world.locations, file, **json_dump_args)
 
+    print("Saving song goals...")
+    with open(manual_data_path("song_goals.json"), "w", encoding="utf-8") as file:
+        json.dump(world.song_goals, file, **json_dump_args)
+
     print("Saving categories...")
     with open(manual_data_path("categories.json"), "w", encoding="utf-8") as file:
         json.dump(world.categories, file, **json_dump_args)
 
+    print("Saving ids...")
+    save_id_map(json_dump_args)
+
+    print("Saving tables bundle...")
+    save_tables_bundle()
+
     print("Saving apworld...")
     with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zip_file:
         manual_src = script_dir.parent / "src"
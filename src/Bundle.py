@@ -0,0 +1,366 @@
+# Precompiled data bundle
+#
+# scripts/build.py writes two files next to the json files:
+# - data/datapackage.index, the ids, name groups and small tables the world needs to be defined,
+#   so the launcher and the clients never have to load the big tables
+# - data/tables.bundle, every table after its after_load_* hook with ids assigned, loaded once a world is generated,
+#   along with the names of the items and locations of every category
+# - data/locations.shards, the locations split by get_location_shard_key from hooks/Data.py (one shard per song),
+#   the bundle only keeps their name and id until a shard is needed
+# Data.py only uses them when the json files and hooks/Data.py are byte for byte the ones they were built from,
+# otherwise everything is loaded from json like before.
+#
+# The requires aren't stored parsed: Rules.py replaces the {functions} of a requires with their result every time it's
+# checked, and those depend on the player's options and items, so its |items| are only known at that point.
+#
+# Only the standard library is used here so the build script can load this file without Archipelago.
+
+import hashlib
+import pickle
+import struct
+from typing import Any, Callable, Iterable, Optional
+
+BUNDLE_FORMAT = 2
+BUNDLE_FILE = "data/tables.bundle"
+INDEX_FILE = "data/datapackage.index"
+SHARDS_FILE = "data/locations.shards"
+# The persisted ids of every item and location name, {"items": {name: id}, "locations": {name: id}}, see update_id_map
+ID_MAP_FILE = "ids.json"
+
+# The shards file starts with this magic, the size of the shards after the header and their sha256, written by the build
+# so Data.py can check the file belongs to the bundle without reading all of it
+SHARDS_MAGIC = b"MANUALSH"
+SHARDS_HEADER = struct.Struct("<8sQ32s")
+
+# Every file the bundle is built from, in the order Data.py loads them
+TABLE_FILES = ["game.json", "items.json", "locations.json", "regions.json", "categories.json", "options.json", "meta.json"]
+SOURCE_FILES = [f"data/{filename}" for filename in TABLE_FILES + [ID_MAP_FILE]] + ["hooks/Data.py"]
+# The tables small enough to go in the index, they're all read when the world is imported
+INDEX_TABLE_FILES = ["game.json", "regions.json", "options.json", "meta.json"]
+
+
+def source_hash(read_file: Callable[[str], Optional[bytes]], data_sources: Iterable[str] = ()) -> str:
+    """Hash the bundle's source files, read with read_file(path relative to the apworld root), and the data files
+    its location templates are made from. Missing files hash as empty."""
+    digest = hashlib.sha256(f"Manual bundle format {BUNDLE_FORMAT}".encode())
+    for path in SOURCE_FILES + [f"data/{filename}" for filename in sorted(set(data_sources))]:
+        data = read_file(path) or b""
+        digest.update(path.encode() + b"\0" + len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def read_bundle(data: bytes, expected_hash: Callable[[list[str]], str]) -> Optional[dict]:
+    """Return the bundle (or index) in data, or None if it's from another bundle format or was built from other source files\n
+    expected_hash(data_sources) is the source_hash of the current files, with the template data sources the bundle lists
+    """
+    try:
+        bundle = pickle.loads(data)
+    except Exception:
+        return None
+
+    if not isinstance(bundle, dict) or bundle.get("format") != BUNDLE_FORMAT:
+        return None
+    if bundle.get("source_hash") != expected_hash(bundle.get("data_sources", [])):
+        return None
+    return bundle
+
+
+######################
+# Table preparation, shared by Items.py/Locations.py and the build
+######################
+
+def get_starting_index(game_table: dict) -> int:
+    if "starting_index" in game_table:
+        try:
+            return int(game_table["starting_index"])
+        except ValueError:
+            raise Exception("The value of data/game.json:'starting_index' should be an int")
+    return 1
+
+
+def get_filler_item_name(game_table: dict) -> str:
+    return game_table["filler_item_name"] if "filler_item_name" in game_table else "Filler"
+
+
+def prepare_item_table(item_table: list, starting_index: int, filler_item_name: str, id_map: Optional[dict[str, int]] = None) -> None:
+    """Add the filler item and give every item its id, progression flag, category list and lowercased values
+
+    With an id_map (the "items" of ids.json), the ids come from it instead of from the order of the items
+    """
+    count = starting_index
+
+    # add the filler item to the list of items for lookup
+    if filler_item_name:
+        item_table.append({
+            "name": filler_item_name
+        })
+
+    if id_map:
+        assign_mapped_ids(item_table, id_map, starting_index)
+
+    # add sequential generated ids to the lists
+    for key, val in enumerate(item_table):
+        if not id_map:
+            if "id" in item_table[key]:
+                item_id = item_table[key]["id"]
+                if item_id >= count:
+                    count = item_id
+                else:
+                    raise ValueError(f"{item_table[key]['name']} has an invalid ID. ID must be at least {count + 1}")
+
+            item_table[key]["id"] = count
+        item_table[key]["progression"] = val["progression"] if "progression" in val else False
+        if isinstance(val.get("category", []), str):
+            item_table[key]["category"] = [val["category"]]
+
+        #Just lowercase the values here to remove all the .lower.strip down the line
+        item_table[key]["value"] = {k.lower().strip(): v
+                                    for k, v in val.get("value", {}).items()}
+
+        count += 1
+
+
+def prepare_location_table(location_table: list, starting_index: int, id_map: Optional[dict[str, int]] = None) -> None:
+    """Give every location its id, region and category list, and add the game completion location if there's no victory location
+
+    With an id_map (the "locations" of ids.json), the ids come from it instead of from the order of the locations
+    """
+    count = starting_index
+    has_victory = False
+
+    # add sequential generated ids to the lists
+    for key, _ in enumerate(location_table):
+        if "victory" in location_table[key] and location_table[key]["victory"]:
+            has_victory = True
+
+        if not id_map:
+            if "id" in location_table[key]:
+                item_id = location_table[key]["id"]
+                if item_id >= count:
+                    count = item_id
+                else:
+                    raise ValueError(f"{location_table[key]['name']} has an invalid ID. ID must be at least {count + 1}")
+
+            location_table[key]["id"] = count
+
+        if "region" not in location_table[key]:
+            location_table[key]["region"] = "Manual" # all locations are in the same region for Manual
+
+        if isinstance(location_table[key].get("category", []), str):
+            location_table[key]["category"] = [location_table[key]["category"]]
+
+        count += 1
+
+    if not has_victory:
+        # Add the game completion location, which will have the Victory item assigned to it automatically
+        location_table.append({
+            "id": count + 1,
+            "name": "__Manual Game Complete__",
+            "region": "Manual",
+            "requires": []
+            # "category": custom_victory_location["category"] if "category" in custom_victory_location else []
+        })
+        if id_map:
+            location_table[-1].pop("id")
+
+    if id_map:
+        assign_mapped_ids(location_table, id_map, starting_index)
+
+
+def assign_mapped_ids(table: list, id_map: dict[str, int], starting_index: int) -> None:
+    """Give every entry without an "id" the one id_map has for its name, entries that aren't in it get the ids after
+    the highest one in order (scripts/build.py adds them to ids.json so they keep those ids)"""
+    next_id = max([starting_index - 1, *id_map.values()]) + 1
+    used_ids: dict[int, str] = {}
+
+    for entry in table:
+        if "id" not in entry:
+            if entry["name"] in id_map:
+                entry["id"] = id_map[entry["name"]]
+            else:
+                entry["id"] = next_id
+                next_id += 1
+
+        if entry["id"] in used_ids:
+            raise ValueError(f"{entry['name']} has an invalid ID. {entry['id']} is already the ID of {used_ids[entry['id']]}")
+        used_ids[entry["id"]] = entry["name"]
+
+
+def update_id_map(id_map: dict[str, int], table: list) -> dict[str, int]:
+    """The id map of a prepared table, for ids.json: every name of id_map keeps its id, even when it isn't in the table
+    anymore, and new names get the ids after the highest one. An empty id_map takes the ids the table already has."""
+    if not id_map:
+        return {entry["name"]: entry["id"] for entry in table}
+
+    id_map = dict(id_map)
+    next_id = max(id_map.values()) + 1
+    for entry in table:
+        if entry["name"] not in id_map:
+            id_map[entry["name"]] = next_id
+            next_id += 1
+    return id_map
+
+
+def get_victory_names(location_table: list) -> list[str]:
+    """The names of the victory locations of a prepared location table"""
+    victory_names = [location["name"] for location in location_table if location.get("victory")]
+    return victory_names or ["__Manual Game Complete__"]
+
+
+def build_name_groups(table: list, value_groups: bool = False) -> dict[str, list[str]]:
+    """Group the names of a prepared table by category, and by 'has_X_value' for every value X if value_groups"""
+    name_groups: dict[str, list[str]] = {}
+    for entry in table:
+        for c in entry.get("category", []):
+            if c not in name_groups:
+                name_groups[c] = []
+            name_groups[c].append(entry["name"])
+
+        if value_groups:
+            for v in entry.get("value", {}).keys():
+                group_name = f"has_{v}_value"
+                if group_name not in name_groups:
+                    name_groups[group_name] = []
+                name_groups[group_name].append(entry["name"])
+    return name_groups
+
+
+def exported_name_groups(name_groups: dict[str, list[str]], is_exported: Callable[[str], bool]) -> dict[str, list[str]]:
+    """The name groups the world class gets, is_exported(group_name) deciding which ones"""
+    return {group_name: names for group_name, names in name_groups.items() if is_exported(group_name)}
+
+
+def load_tables(load_file: Callable[[str], Any], hooks: Any, templates: Any) -> dict[str, Any]:
+    """Load every table the way Data.py does, with load_file(filename) returning the parsed json file,
+    hooks being hooks/Data.py and templates being Templates.py"""
+    def load(filename: str, data_type: type) -> Any:
+        contents = load_file(filename)
+        if not contents and type(contents) != data_type:
+            return data_type()
+        return contents
+
+    def convert_to_list(data: Any) -> list:
+        if isinstance(data, dict):
+            data = data.get('data', [])
+        return data
+
+    region_table = load('regions.json', dict)
+    region_table.pop('$schema', '')
+    category_table = load('categories.json', dict)
+    category_table.pop('$schema', '')
+
+    return {
+        "game.json": hooks.after_load_game_file(load('game.json', dict)),
+        "items.json": hooks.after_load_item_file(convert_to_list(load('items.json', list))),
+        "locations.json": hooks.after_load_location_file(templates.expand_location_templates(convert_to_list(load('locations.json', list)), load_file)),
+        "regions.json": hooks.after_load_region_file(region_table),
+        "categories.json": hooks.after_load_category_file(category_table),
+        "options.json": hooks.after_load_option_file(load('options.json', dict)),
+        "meta.json": hooks.after_load_meta_file(load('meta.json', dict)),
+    }
+
+
+def compile_bundle(tables: dict[str, Any], hash: str, data_sources: list[str], id_map: Optional[dict] = None) -> dict:
+    """Prepare the hooked tables (filename: table) like Data.py does and return the bundle to write\n
+    hash is the source_hash of the files they were loaded from, including the data_sources of the location templates,
+    id_map is the content of ids.json if there's one
+    """
+    game_table = tables["game.json"]
+    starting_index = get_starting_index(game_table)
+    id_map = id_map or {}
+    # like Data.py, empty tables are left empty so the world reports them instead of only having the filler item/victory location
+    if tables["items.json"]:
+        prepare_item_table(tables["items.json"], starting_index, get_filler_item_name(game_table), id_map.get("items"))
+    if tables["locations.json"]:
+        prepare_location_table(tables["locations.json"], starting_index, id_map.get("locations"))
+
+    return {
+        "format": BUNDLE_FORMAT,
+        "source_hash": hash,
+        "data_sources": data_sources,
+        "tables": tables,
+        # Items.item_category_index and Locations.location_category_index, made before the locations are split in shards
+        "item_category_index": build_name_groups(tables["items.json"]),
+        "location_category_index": build_name_groups(tables["locations.json"]),
+    }
+
+
+def compile_index(bundle: dict, is_exported_group: Callable[[dict, str], bool] = lambda category_table, group_name: True) -> dict:
+    """Return the datapackage index of a compiled bundle\n
+    is_exported_group(category_table, group_name) is Categories.is_exported_name_group, only those groups are in the index
+    """
+    tables = bundle["tables"]
+    is_exported: Callable[[str], bool] = lambda group_name: is_exported_group(tables["categories.json"], group_name)
+    item_table = tables["items.json"]
+    location_table = tables["locations.json"]
+
+    return {
+        "format": BUNDLE_FORMAT,
+        "source_hash": bundle["source_hash"],
+        "data_sources": bundle["data_sources"],
+        "tables": {filename: tables[filename] for filename in INDEX_TABLE_FILES},
+        "items": {
+            "id_to_name": {item["id"]: item["name"] for item in item_table},
+            "name_groups": exported_name_groups(build_name_groups(item_table, value_groups=True), is_exported),
+            "has_traps": any(item.get("trap") for item in item_table),
+        },
+        "locations": {
+            "id_to_name": {location["id"]: location["name"] for location in location_table},
+            "name_groups": exported_name_groups(build_name_groups(location_table), is_exported),
+            "victory_names": get_victory_names(location_table),
+        },
+        # what Options.py needs from categories.json
+        "category_yaml_options": {category: values["yaml_option"] for category, values in tables["categories.json"].items()
+                                  if values.get("yaml_option")},
+    }
+
+
+def split_location_shards(bundle: dict, shard_key: Callable[[dict], Optional[str]]) -> bytes:
+    """Move every location shard_key gives a key out of the bundle, leaving a stub with its name, id and shard key\n
+    Returns the shards file, a SHARDS_HEADER then one pickled {name: location} per key, the bundle gets where each one is
+    in it (after the header) and the hash of the header
+    """
+    location_table = bundle["tables"]["locations.json"]
+    shards: dict[str, dict[str, dict]] = {}
+
+    for index, location in enumerate(location_table):
+        key = shard_key(location)
+        if key is None:
+            continue
+
+        shards.setdefault(key, {})[location["name"]] = location
+        location_table[index] = {"name": location["name"], "id": location["id"], "_shard": key}
+
+    shards_file = bytearray()
+    offsets: dict[str, tuple[int, int]] = {}
+    for key, locations in shards.items():
+        data = pickle.dumps(locations, protocol=5)
+        offsets[key] = (len(shards_file), len(data))
+        shards_file += data
+
+    digest = hashlib.sha256(shards_file).digest()
+    bundle["location_shards"] = {
+        "offsets": offsets,
+        "hash": digest.hex(),
+    }
+    return SHARDS_HEADER.pack(SHARDS_MAGIC, len(shards_file), digest) + bytes(shards_file)
+
+
+def location_shards_match(shards_file: Optional[bytes], bundle: dict) -> bool:
+    """If shards_file is the shards file the bundle was split with, from its header and size only"""
+    if shards_file is None or len(shards_file) < SHARDS_HEADER.size:
+        return False
+    magic, size, digest = SHARDS_HEADER.unpack_from(shards_file)
+    return magic == SHARDS_MAGIC and size == len(shards_file) - SHARDS_HEADER.size and digest.hex() == bundle["location_shards"]["hash"]
+
+
+def read_location_shard(shards_file: bytes, offsets: dict[str, tuple[int, int]], key: str) -> dict[str, dict]:
+    start, length = offsets[key]
+    start += SHARDS_HEADER.size
+    return pickle.loads(memoryview(shards_file)[start:start + length])
+
+
+def write_bundle(bundle: dict) -> bytes:
+    """Serialize a bundle or an index"""
+    return pickle.dumps(bundle, protocol=5)
@@ -0,0 +1,76 @@
+# Category rules
+#
+# Besides category names, categories.json can have rules that give their settings to every category they match,
+# the key being the pattern and "match" saying how to read it:
+# {
+#     "Song Number *": {"match": "glob", "hidden": true},
+#     "^\\(Traps\\) .*$": {"match": "regex", "hidden": true}
+# }
+# - "glob" patterns use * and ? (see fnmatch), "regex" patterns have to match the whole name
+# - a category listed by its own name always uses its own settings, otherwise the first rule that matches it is used
+# - "name_group": false keeps a category out of the item/location name groups sent to clients, the groups of
+#   has_X_value are configured the same way, by their name
+# Use get_category_settings instead of looking names up in the category table, the answer for every name is cached.
+# The cache starts over when categories are added or removed, but not when the settings of a category or rule are edited
+# in place: change categories in after_load_category_file, or call clear_category_rules_cache() after editing them later.
+#
+# Only the standard library is used here so the client can use it without generating.
+
+import re
+from fnmatch import translate
+from typing import Any, Optional
+
+CATEGORY_RULE_TYPES = ("glob", "regex")
+
+# id of a category table: (the table, its size, its compiled rules, the settings found for every name so far)
+_matchers: dict[int, tuple[dict, int, list[tuple[re.Pattern, dict]], dict[str, dict]]] = {}
+
+
+def is_category_rule(settings: Any) -> bool:
+    return isinstance(settings, dict) and settings.get("match") in CATEGORY_RULE_TYPES
+
+
+def compile_category_rules(category_table: dict) -> list[tuple[re.Pattern, dict]]:
+    """The rules of category_table in order, as (compiled pattern, settings without 'match')"""
+    rules = []
+    for pattern, settings in category_table.items():
+        if not is_category_rule(settings):
+            continue
+
+        try:
+            compiled = re.compile(translate(pattern) if settings["match"] == "glob" else pattern)
+        except re.error as e:
+            raise ValueError(f"The category rule '{pattern}' isn't a valid {settings['match']} pattern: {e}") from e
+        rules.append((compiled, {key: value for key, value in settings.items() if key != "match"}))
+    return rules
+
+
+def get_category_settings(category_table: Optional[dict], category_name: str) -> dict:
+    """The settings of a category, from its own entry of category_table or from the first rule that matches it, {} if neither\n
+    The answers are cached until categories are added to or removed from category_table, see clear_category_rules_cache
+    """
+    if not category_table:
+        return {}
+
+    matcher = _matchers.get(id(category_table))
+    if matcher is None or matcher[0] is not category_table or matcher[1] != len(category_table):
+        matcher = _matchers[id(category_table)] = (category_table, len(category_table), compile_category_rules(category_table), {})
+    _, _, rules, found = matcher
+
+    settings = found.get(category_name)
+    if settings is None:
+        settings = category_table.get(category_name)
+        if settings is None or is_category_rule(settings):
+            settings = next((rule_settings for pattern, rule_settings in rules if pattern.fullmatch(category_name)), {})
+        found[category_name] = settings
+    return settings
+
+
+def is_exported_name_group(category_table: Optional[dict], group_name: str) -> bool:
+    """If the name group of a category (or of a has_X_value group) is part of the world's item/location name groups"""
+    return get_category_settings(category_table, group_name).get("name_group", True)
+
+
+def clear_category_rules_cache() -> None:
+    """Forget the compiled rules and the settings found so far, for when the settings in a category table are edited"""
+    _matchers.clear()
@@ -1,7 +1,17 @@
 import logging
+import pkgutil
+import sys
+from abc import update_abstractmethods
+from collections.abc import Mapping, MutableMapping, MutableSequence
+from functools import cache
+from typing import Any, Callable, Iterable, Optional
 
+from .Bundle import BUNDLE_FILE, ID_MAP_FILE, INDEX_FILE, SHARDS_FILE, read_bundle, source_hash, location_shards_match, read_location_shard, \
+    get_filler_item_name, get_starting_index, prepare_item_table, prepare_location_table
 from .DataValidation import DataValidation, ValidationError
-from .Helpers import load_data_file as helpers_load_data_file
+from .Helpers import clear_data_file_cache, load_data_file as helpers_load_data_file
+from .Profiling import profile_stage
+from .Templates import expand_location_templates, get_template_sources
 
 from .hooks.Data import \
     after_load_game_file, \
@@ -15,7 +25,7 @@ def load_data_file(*args) -> dict:
     return helpers_load_data_file(*args)
 
 def convert_to_list(data, property_name: str) -> list:
-    if isinstance(data, dict):
+    if isinstance(data, Mapping):
         data = data.get(property_name, [])
     return data
 
@@ -28,7 +38,8 @@ class ManualFile:
         self.data_type = data_type
 
     def load(self):
-        contents = helpers_load_data_file(self.filename)
+        with profile_stage(f"ManualFile.load {self.filename}"):
+            contents = helpers_load_data_file(self.filename)
 
         if not contents and type(contents) != self.data_type:
             return self.data_type()
@@ -36,51 +47,410 @@ class ManualFile:
         return contents
 
 
-game_table = ManualFile('game.json', dict).load() #dict
-item_table = convert_to_list(ManualFile('items.json', list).load(), 'data') #list
-location_table = convert_to_list(ManualFile('locations.json', list).load(), 'data') #list
-region_table = ManualFile('regions.json', dict).load() #dict
-category_table = ManualFile('categories.json', dict).load() #dict
-option_table = ManualFile('options.json', dict).load() #dict
-meta_table = ManualFile('meta.json', dict).load() #dict
+######################
+# Lazy tables
+######################
 
-# Removal of schemas in root of tables
-region_table.pop('$schema', '')
-category_table.pop('$schema', '')
+class _TableDict(MutableMapping):
+    __slots__ = ('_loader', '_on_load', '_data')
 
-# hooks
-game_table = after_load_game_file(game_table)
-item_table = after_load_item_file(item_table)
-location_table = after_load_location_file(location_table)
-region_table = after_load_region_file(region_table)
-category_table = after_load_category_file(category_table)
-option_table = after_load_option_file(option_table)
-meta_table = after_load_meta_file(meta_table)
+    def __init__(self, loader: Callable[[], dict], on_load: Optional[Callable[[dict], None]] = None):
+        self._loader = loader
+        self._on_load = on_load
+        self._data: Optional[dict] = None
+
+class _TableList(MutableSequence):
+    __slots__ = ('_loader', '_on_load', '_data')
+
+    def __init__(self, loader: Callable[[], list], on_load: Optional[Callable[[list], None]] = None):
+        self._loader = loader
+        self._on_load = on_load
+        self._data: Optional[list] = None
+
+class LoadedDict(_TableDict):
+    """A LazyDict that has been loaded, every method goes straight to the dict it loaded"""
+    __slots__ = ()
+
+    def __getitem__(self, key): return self._data[key]
+    def __setitem__(self, key, value): self._data[key] = value
+    def __delitem__(self, key): del self._data[key]
+    def __contains__(self, key): return key in self._data
+    def __iter__(self): return iter(self._data)
+    def __reversed__(self): return reversed(self._data)
+    def __len__(self): return len(self._data)
+    def __eq__(self, other): return self._data == other
+    def __ne__(self, other): return self._data != other
+    def __or__(self, other): return self._data | other
+    def __ror__(self, other): return other | self._data
+    def __ior__(self, other):
+        self._data |= other
+        return self
+    def __repr__(self): return repr(self._data)
+    def __reduce__(self): return (dict, (self._data,))
+    def get(self, key, default=None): return self._data.get(key, default)
+    def keys(self): return self._data.keys()
+    def values(self): return self._data.values()
+    def items(self): return self._data.items()
+    def pop(self, *args): return self._data.pop(*args)
+    def popitem(self): return self._data.popitem()
+    def setdefault(self, key, default=None): return self._data.setdefault(key, default)
+    def update(self, *args, **kwargs): self._data.update(*args, **kwargs)
+    def copy(self) -> dict: return self._data.copy()
+    def clear(self): self._data.clear()
+
+class LoadedList(_TableList):
+    """A LazyList that has been loaded, every method goes straight to the list it loaded"""
+    __slots__ = ()
+
+    def __getitem__(self, index): return self._data[index]
+    def __setitem__(self, index, value): self._data[index] = value
+    def __delitem__(self, index): del self._data[index]
+    def __contains__(self, value): return value in self._data
+    def __iter__(self): return iter(self._data)
+    def __reversed__(self): return reversed(self._data)
+    def __len__(self): return len(self._data)
+    def __eq__(self, other): return self._data == other
+    def __ne__(self, other): return self._data != other
+    def __add__(self, other): return self._data + other
+    def __radd__(self, other): return other + self._data
+    def __iadd__(self, other):
+        self._data += other
+        return self
+    def __mul__(self, count): return self._data * count
+    def __rmul__(self, count): return self._data * count
+    def __imul__(self, count):
+        self._data *= count
+        return self
+    def __repr__(self): return repr(self._data)
+    def __reduce__(self): return (list, (self._data,))
+    def append(self, value): self._data.append(value)
+    def extend(self, values): self._data.extend(values)
+    def insert(self, index, value): self._data.insert(index, value)
+    def pop(self, *args): return self._data.pop(*args)
+    def remove(self, value): self._data.remove(value)
+    def index(self, *args): return self._data.index(*args)
+    def count(self, value): return self._data.count(value)
+    def sort(self, *args, **kwargs): self._data.sort(*args, **kwargs)
+    def reverse(self): self._data.reverse()
+    def copy(self) -> list: return self._data.copy()
+    def clear(self): self._data.clear()
+
+class LazyDict(_TableDict):
+    """A dict that is filled with the result of loader() the first time it is used, then calls on_load(table)\n
+    It isn't a dict subclass, so there's no way to read it without loading it: C code like json.dumps reads a dict's
+    storage directly and would see an empty one, it refuses a LazyDict instead (use dict(table) there)\n
+    Once loaded it becomes a LoadedDict, which hands every call straight to the loaded dict
+    """
+    __slots__ = ()
+
+    def _load(self):
+        with profile_stage(getattr(self._loader, '__name__', 'LazyDict')):
+            data = self._loader()
+            self._data = data if type(data) is dict else dict(data)
+            self.__class__ = LoadedDict
+            if self._on_load is not None:
+                self._on_load(self)
+
+    def __repr__(self):
+        return f"<LazyDict of {getattr(self._loader, '__name__', self._loader)}, not loaded yet>"
+
+class LazyList(_TableList):
+    """A list that is filled with the result of loader() the first time it is used, then calls on_load(table)\n
+    It isn't a list subclass, so there's no way to read it without loading it: C code like list.__add__ or json.dumps
+    reads a list's storage directly and would see an empty one, they go through its methods or refuse it instead\n
+    Once loaded it becomes a LoadedList, which hands every call straight to the loaded list
+    """
+    __slots__ = ()
+
+    def _load(self):
+        with profile_stage(getattr(self._loader, '__name__', 'LazyList')):
+            data = self._loader()
+            self._data = data if type(data) is list else list(data)
+            self.__class__ = LoadedList
+            if self._on_load is not None:
+                self._on_load(self)
+
+    def __repr__(self):
+        return f"<LazyList of {getattr(self._loader, '__name__', self._loader)}, not loaded yet>"
+
+def _load_before(name: str):
+    def method(self, *args, **kwargs):
+        self._load()
+        return getattr(self, name)(*args, **kwargs)
+    method.__name__ = name
+    return method
+
+for name in ['__getitem__', '__setitem__', '__delitem__', '__contains__', '__iter__', '__reversed__', '__len__', '__eq__', '__ne__',
+             '__or__', '__ror__', '__ior__', '__reduce__', 'get', 'keys', 'values', 'items', 'pop', 'popitem', 'setdefault', 'update',
+             'copy', 'clear']:
+    setattr(LazyDict, name, _load_before(name))
+
+for name in ['__getitem__', '__setitem__', '__delitem__', '__contains__', '__iter__', '__reversed__', '__len__', '__eq__', '__ne__',
+             '__add__', '__radd__', '__iadd__', '__mul__', '__rmul__', '__imul__', '__reduce__', 'append', 'extend', 'insert', 'pop',
+             'remove', 'index', 'count', 'sort', 'reverse', 'copy', 'clear']:
+    setattr(LazyList, name, _load_before(name))
+
+del name
+# the methods were added after the classes were made, so they're still seen as abstract until this is updated
+update_abstractmethods(LazyDict)
+update_abstractmethods(LazyList)
+
+def load_table(table: _TableDict|_TableList) -> None:
+    """Load a LazyDict/LazyList now if it isn't loaded yet"""
+    if isinstance(table, (LazyDict, LazyList)):
+        table._load()
+
+def unload_table(table: _TableDict|_TableList) -> None:
+    """Empty a LazyDict/LazyList so it's loaded again the next time it's used"""
+    if isinstance(table, LoadedDict):
+        table._data = None
+        table.__class__ = LazyDict
+    elif isinstance(table, LoadedList):
+        table._data = None
+        table.__class__ = LazyList
+
+
+######################
+# Manual tables
+######################
+
+def _read_package_file(path: str) -> Optional[bytes]:
+    try:
+        return pkgutil.get_data(__name__, path)
+    except OSError:
+        return None
+
+@cache
+def _source_hash(data_sources: tuple[str, ...]) -> str:
+    return source_hash(_read_package_file, data_sources)
+
+def _load_precompiled(path: str) -> dict:
+    """One of the files precompiled by scripts/build.py, or {} when it's missing or was built from other json files"""
+    with profile_stage(f"read {path}"):
+        data = _read_package_file(path)
+        if not data:
+            return {}
+
+        precompiled = read_bundle(data, lambda data_sources: _source_hash(tuple(data_sources)))
+    if precompiled is None:
+        logging.debug(f"Manual: {path} doesn't match the json files, loading them instead")
+        return {}
+    return precompiled
+
+# The locations split out of the bundle, see Bundle.split_location_shards. Only the shards that are used get unpickled
+_location_shards_file: Optional[bytes] = None
+_location_shards: dict[str, dict[str, dict]] = {}
+# The bundle's locations, with a stub ({"name", "id", "_shard"}) in place of every location of a shard
+_bundle_locations: Optional[list] = None
+
+def _load_bundle() -> dict:
+    global _location_shards_file
+    bundle = _load_precompiled(BUNDLE_FILE)
+
+    if "location_shards" in bundle:
+        shards_file = _read_package_file(SHARDS_FILE)
+        if not location_shards_match(shards_file, bundle):
+            logging.debug(f"Manual: {SHARDS_FILE} doesn't match {BUNDLE_FILE}, loading the json files instead")
+            return {}
+        _location_shards_file = shards_file
+    return bundle
+
+def _get_bundle_locations() -> list:
+    global _bundle_locations
+    if _bundle_locations is None:
+        _bundle_locations = _compact_entries(bundle["tables"].pop("locations.json"))
+    return _bundle_locations
+
+def _load_sharded_location(stub: dict) -> dict:
+    """The location of the bundle's stub, loading its shard the first time one of its locations is needed\n
+    The shard's locations are kept, so location_table and every world.location_table get the same dicts
+    """
+    key = stub["_shard"]
+    if key not in _location_shards:
+        with profile_stage(f"location shard {key}"):
+            shard = read_location_shard(_location_shards_file, bundle["location_shards"]["offsets"], key)
+            _compact_entries(list(shard.values()))
+            _location_shards[key] = shard
+    return _location_shards[key][stub["name"]]
+
+def _load_datapackage_index() -> dict:
+    return _load_precompiled(INDEX_FILE)
+
+# The ids, name groups and small tables, enough to define the world without loading the big tables
+datapackage_index = LazyDict(_load_datapackage_index)
+# Every table, only loaded once one of the big tables is used
+bundle = LazyDict(_load_bundle)
+
+# One list for every set of categories, see _compact_entries
+_category_lists: dict[tuple, list] = {}
+
+def _compact_entries(table: list) -> list:
+    """Intern the strings (names, requires, categories...) of the entries of a prepared item or location table, and make
+    the entries with the same categories share one category list, so what's repeated across thousands of entries is only
+    stored once\n
+    Entries stay plain dicts, but a category list can belong to many of them: replace it instead of changing it in place
+    """
+    for entry in table:
+        if not isinstance(entry, dict):
+            continue
+        for key, value in entry.items():
+            if type(value) is str:
+                entry[key] = sys.intern(value)
+        categories = entry.get("category")
+        if isinstance(categories, list) and categories:
+            try:
+                shared = _category_lists.get(tuple(categories))
+            except TypeError: # not all strings, left as it is
+                continue
+            if shared is None:
+                shared = _category_lists[tuple(categories)] = [sys.intern(c) if isinstance(c, str) else c for c in categories]
+            entry["category"] = shared
+    return table
+
+def _run_hook(hook: Callable[[Any], Any], table: Any) -> Any:
+    with profile_stage(hook.__name__):
+        return hook(table)
+
+def _precompiled_table(filename: str) -> Optional[Any]:
+    """The table from the datapackage index or the bundle, which already went through its after_load_* hook at build time"""
+    if filename in datapackage_index.get("tables", {}):
+        return datapackage_index["tables"][filename]
+    if bundle:
+        # each table is only loaded once, so don't keep a second copy of it around in the bundle
+        return bundle["tables"].pop(filename)
+    return None
+
+def _load_id_map(kind: str) -> Optional[dict[str, int]]:
+    """The ids of ids.json for "items" or "locations", None when there's no ids.json and ids follow the order of the table"""
+    id_map = helpers_load_data_file(ID_MAP_FILE, read_only=True)
+    return id_map.get(kind) if isinstance(id_map, Mapping) else None
+
+def _load_game_table() -> dict:
+    game_table = _precompiled_table('game.json')
+    if game_table is None:
+        game_table = _run_hook(after_load_game_file, ManualFile('game.json', dict).load())
+    return game_table
+
+def _load_item_table() -> list:
+    item_table = _precompiled_table('items.json')
+    if item_table is None:
+        item_table = _run_hook(after_load_item_file, convert_to_list(ManualFile('items.json', list).load(), 'data'))
+        if not item_table:
+            return item_table # left empty so checkForItemsBeingInvalidJSON reports it
+        # add the filler item and sequential generated ids to the lists
+        with profile_stage("assign item ids"):
+            prepare_item_table(item_table, get_starting_index(game_table), get_filler_item_name(game_table), _load_id_map("items"))
+    with profile_stage("compact items"):
+        return _compact_entries(item_table)
+
+def _load_location_table() -> list:
+    if bundle:
+        # every location, so every shard gets loaded (see select_location_shards)
+        return [location if "_shard" not in location else _load_sharded_location(location) for location in _get_bundle_locations()]
+
+    location_table = convert_to_list(ManualFile('locations.json', list).load(), 'data')
+    with profile_stage("expand location templates"):
+        location_table = expand_location_templates(location_table, lambda filename: helpers_load_data_file(filename, read_only=True))
+    location_table = _run_hook(after_load_location_file, location_table)
+    if not location_table:
+        return location_table # left empty so checkForLocationsBeingInvalidJSON reports it
+    # add sequential generated ids to the lists, and the game completion location if there's no victory location
+    with profile_stage("assign location ids"):
+        prepare_location_table(location_table, get_starting_index(game_table), _load_id_map("locations"))
+    with profile_stage("compact locations"):
+        return _compact_entries(location_table)
+
+def _load_region_table() -> dict:
+    region_table = _precompiled_table('regions.json')
+    if region_table is None:
+        region_table = ManualFile('regions.json', dict).load()
+        region_table.pop('$schema', '') # Removal of schemas in root of tables
+        region_table = _run_hook(after_load_region_file, region_table)
+    return region_table
+
+def _load_category_table() -> dict:
+    category_table = _precompiled_table('categories.json')
+    if category_table is None:
+        category_table = ManualFile('categories.json', dict).load()
+        category_table.pop('$schema', '')
+        category_table = _run_hook(after_load_category_file, category_table)
+    return category_table
+
+def _load_option_table() -> dict:
+    option_table = _precompiled_table('options.json')
+    if option_table is None:
+        option_table = _run_hook(after_load_option_file, ManualFile('options.json', dict).load())
+    return option_table
+
+def _load_meta_table() -> dict:
+    meta_table = _precompiled_table('meta.json')
+    if meta_table is None:
+        meta_table = _run_hook(after_load_meta_file, ManualFile('meta.json', dict).load())
+    return meta_table
+
+def select_location_shards(world: Any, keys: Iterable[str]) -> None:
+    """Make world.location_table and world.location_name_to_location only have the locations of the shards in keys,
+    and the ones without a shard. Only those shards are loaded, the world knows the other locations by name and id only.\n
+    Call it in before_create_regions with the keys of every location that can be enabled for that world.
+    It does nothing when the locations don't come from a bundle with location shards.
+    """
+    if not bundle or "location_shards" not in bundle:
+        return
+
+    keys = set(keys)
+    world.location_table = [location if "_shard" not in location else _load_sharded_location(location)
+                            for location in _get_bundle_locations() if "_shard" not in location or location["_shard"] in keys]
+    world.location_name_to_location = {location["name"]: location for location in world.location_table}
+
+def _validate_on_load(check: Callable[[], None]) -> Callable[[Any], None]:
+    """Run one of the DataValidation 'is invalid JSON' checks once its table is loaded and display its error if it fails"""
+    def on_load(_table):
+        with profile_stage(f"DataValidation.{check.__name__}"):
+            try: check()
+            except ValidationError as e: display_validation_errors([e])
+    return on_load
+
+def display_validation_errors(validation_errors: list[ValidationError]) -> None:
+    if len(validation_errors) > 0:
+        logging.error("\nValidationError(s): \n\n%s\n\n" % ("\n".join([' - ' + str(validation_error) for validation_error in validation_errors])))
+        print("\n\nYou can close this window.\n")
+        keeping_terminal_open = input("If you are running from a terminal, press Ctrl-C followed by ENTER to break execution.")
+
+# Each table is only read (from the index, the bundle or its json file) and checked the first time it's used
+game_table = LazyDict(_load_game_table, _validate_on_load(DataValidation.checkForGameBeingInvalidJSON)) #dict
+item_table = LazyList(_load_item_table, _validate_on_load(DataValidation.checkForItemsBeingInvalidJSON)) #list
+location_table = LazyList(_load_location_table, _validate_on_load(DataValidation.checkForLocationsBeingInvalidJSON)) #list
+region_table = LazyDict(_load_region_table) #dict
+category_table = LazyDict(_load_category_table) #dict
+option_table = LazyDict(_load_option_table) #dict
+meta_table = LazyDict(_load_meta_table) #dict
 
 # seed all of the tables for validation
 DataValidation.game_table = game_table
 DataValidation.item_table = item_table
 DataValidation.location_table = location_table
 DataValidation.region_table = region_table
+DataValidation.category_table = category_table
 
-validation_errors = []
-
-# check that json files are not just invalid json
-try: DataValidation.checkForGameBeingInvalidJSON()
-except ValidationError as e: validation_errors.append(e)
-
-try: DataValidation.checkForItemsBeingInvalidJSON()
-except ValidationError as e: validation_errors.append(e)
-
-try: DataValidation.checkForLocationsBeingInvalidJSON()
-except ValidationError as e: validation_errors.append(e)
-
+def reset_tables() -> None:
+    """Unload every table, the precompiled files and the parsed json files, so they're all read again from the files
+    the next time they're used (see DevReload.py)"""
+    global _location_shards_file, _bundle_locations
+    _source_hash.cache_clear()
+    _location_shards.clear()
+    _location_shards_file = None
+    _bundle_locations = None
+    _category_lists.clear()
+    clear_data_file_cache()
+    for table in (datapackage_index, bundle, game_table, item_table, location_table, region_table, category_table, option_table, meta_table):
+        unload_table(table)
 
-############
-# If there are any validation errors, display all of them at once
-############
+def get_tables_hash() -> str:
+    """A hash of the files the tables are made from (see Bundle.source_hash), for DataValidation's cache\n
+    It's the bundle's own source hash when the tables come from the bundle
+    """
+    if bundle:
+        return bundle["source_hash"]
 
-if len(validation_errors) > 0:
-    logging.error("\nValidationError(s): \n\n%s\n\n" % ("\n".join([' - ' + str(validation_error) for validation_error in validation_errors])))
-    print("\n\nYou can close this window.\n")
-    keeping_terminal_open = input("If you are running from a terminal, press Ctrl-C followed by ENTER to break execution.")
+    locations = convert_to_list(helpers_load_data_file('locations.json', read_only=True), 'data')
+    return _source_hash(tuple(get_template_sources(locations)))
@@ -0,0 +1,120 @@
+# Hot reload of the data tables, for developing a world
+#
+# Set MANUAL_DEV_RELOAD=1 to have the files of data/ checked for changes every time a multiworld is generated.
+# When one changed, the tables and everything made from them (ids, name groups, category rules, the region map and
+# the name lookups and datapackage of the world class) are rebuilt in place before the generation starts, and the time it took is logged.
+# - it only works when the apworld is a folder, a .apworld is never reloaded
+# - the world class and its options are made from game.json, options.json and meta.json when it's imported,
+#   so changes to the options or the game name still need a restart
+# Call reload_if_changed() from your own scripts to reload between generations of a long running process.
+
+import logging
+import os
+from time import perf_counter
+from typing import Optional
+
+from .Bundle import build_name_groups, exported_name_groups, get_victory_names
+from .Categories import clear_category_rules_cache, is_exported_name_group
+from .Data import reset_tables, unload_table, category_table, item_table, location_table, region_table
+
+DEV_RELOAD_ENV_VAR = "MANUAL_DEV_RELOAD"
+
+dev_reload_enabled = os.environ.get(DEV_RELOAD_ENV_VAR, "").lower() not in ("", "0", "false")
+
+_data_folder = os.path.join(os.path.dirname(__file__), "data")
+
+
+def _snapshot() -> dict[str, int]:
+    """The modification time of every file of data/"""
+    try:
+        with os.scandir(_data_folder) as entries:
+            return {entry.name: entry.stat().st_mtime_ns for entry in entries if entry.is_file()}
+    except OSError:
+        return {}
+
+_last_snapshot = _snapshot() if dev_reload_enabled else {}
+
+
+def reload_if_changed(world_class: Optional[type] = None) -> bool:
+    """Reload the tables if hot reload is enabled and a file of data/ changed since they were loaded, returns if it did\n
+    world_class gets its name lookups rebuilt too, like AutoWorldRegister does when the class is made
+    """
+    global _last_snapshot
+    if not dev_reload_enabled or not os.path.isdir(_data_folder):
+        return False
+
+    snapshot = _snapshot()
+    if snapshot == _last_snapshot:
+        return False
+
+    changed = sorted(name for name in snapshot.keys() | _last_snapshot.keys() if snapshot.get(name) != _last_snapshot.get(name))
+    _last_snapshot = snapshot
+
+    start = perf_counter()
+    reload_tables(world_class)
+    logging.info(f"Manual: reloaded the data tables in {(perf_counter() - start) * 1000:.0f}ms after changes to {', '.join(changed)}")
+    return True
+
+
+def reload_tables(world_class: Optional[type] = None) -> None:
+    """Read every table again from data/ and rebuild what Items.py, Locations.py and Regions.py made from them,
+    keeping the same dict and list objects so every module that imported them sees the new data"""
+    from . import Items, Locations, Regions
+
+    reset_tables()
+    clear_category_rules_cache()
+    is_exported = lambda group_name: is_exported_name_group(category_table, group_name)
+
+    # Items.py
+    for table in (Items.item_name_to_item, Items.item_category_index, Items.item_name_to_index, Items.item_value_matrix):
+        unload_table(table)
+    _refill(Items.item_id_to_name, {item["id"]: item["name"] for item in item_table})
+    _refill(Items.item_name_groups, exported_name_groups(build_name_groups(item_table, value_groups=True), is_exported))
+    Items.has_trap_items = any(item.get("trap") for item in item_table)
+    Items.lastItemId = max((id for id in Items.item_id_to_name if id is not None), default=-1)
+    Items.item_id_to_name[None] = "__Victory__"
+    _refill(Items.item_name_to_id, {name: id for id, name in Items.item_id_to_name.items()})
+
+    # Locations.py
+    unload_table(Locations.location_name_to_location)
+    unload_table(Locations.location_category_index)
+    unload_table(Locations.location_region_index)
+    Locations.location_value_demand.clear()
+    Locations.victory_names[:] = get_victory_names(location_table)
+    _refill(Locations.location_id_to_name, {location["id"]: location["name"] for location in location_table})
+    _refill(Locations.location_name_groups, exported_name_groups(Locations.location_category_index, is_exported))
+    _refill(Locations.location_name_to_id, {name: id for id, name in Locations.location_id_to_name.items()})
+
+    # Regions.py
+    _refill(Regions.regionMap, Regions.build_region_map(region_table))
+    Regions.starting_regions = Regions.regionMap["Manual"]["connects_to"]
+    unload_table(Regions.region_value_demand)
+
+    if world_class is not None:
+        _rebuild_world_lookups(world_class)
+
+
+def _rebuild_world_lookups(world_class: type) -> None:
+    """What AutoWorldRegister makes from the item and location names when the world class is made,
+    and the world's entry of the datapackage (its checksum is how clients know theirs is out of date)"""
+    import worlds
+    from . import Items, Locations
+
+    world_class.item_id_to_name = {code: name for name, code in world_class.item_name_to_id.items()}
+    world_class.location_id_to_name = {code: name for name, code in world_class.location_name_to_id.items()}
+
+    world_class.item_names = frozenset(world_class.item_name_to_id)
+    world_class.item_name_groups = {group_name: frozenset(group_set) for group_name, group_set in Items.item_name_groups.items()}
+    world_class.item_name_groups["Everything"] = world_class.item_names
+
+    world_class.location_names = frozenset(world_class.location_name_to_id)
+    world_class.location_name_groups = {group_name: frozenset(group_set) for group_name, group_set in Locations.location_name_groups.items()}
+    world_class.location_name_groups["Everywhere"] = world_class.location_names
+    world_class.all_item_and_group_names = frozenset(world_class.item_names | set(world_class.item_name_groups))
+
+    worlds.network_data_package["games"][world_class.game] = world_class.get_data_package_data()
+
+
+def _refill(target: dict, source: dict) -> None:
+    target.clear()
+    target.update(source)
@@ -1,37 +1,119 @@
 import ast
 import csv
+import functools
+import mmap
 import os
 import pkgutil
 import json
-
-from BaseClasses import MultiWorld, Item
+import struct
+import zipfile
+import zlib
+
+from array import array
+from collections import deque
+from itertools import compress
+from operator import mul
+from BaseClasses import MultiWorld, Item, ItemClassification
 from enum import IntEnum
-from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any
-from types import GenericAlias
+from typing import Callable, Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any
+from types import GenericAlias, MappingProxyType
 from worlds.AutoWorld import World
+from .Categories import get_category_settings
 from .hooks.Helpers import before_is_category_enabled, before_is_item_enabled, before_is_location_enabled
 
 if TYPE_CHECKING:
     from .Items import ManualItem
     from .Locations import ManualLocation
 
+try:
+    import orjson # faster json parser, used when it's installed alongside Archipelago
+except ImportError:
+    orjson = None
+
+_data_file_cache: dict[str, Any] = {}
+
+def _parse_json(data: bytes|memoryview) -> Any:
+    """Internal method: Parse json with orjson when it's available, falling back to the json module"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass # orjson is stricter than json (lone surrogates for one), give json a try before calling it invalid
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+@functools.cache
+def _open_archive(archive: str) -> tuple[zipfile.ZipFile, mmap.mmap]:
+    """Internal method: The .apworld this is loaded from and a memory map of it, opened once per process"""
+    with open(archive, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return zipfile.ZipFile(mapped), mapped
+
+def _parse_data_file(fname: str) -> Any:
+    """Internal method: Read and parse a json file of this apworld.
+    \nWhen the apworld is loaded from a zip, the member is read straight out of a memory map of the .apworld instead of going through zipimport,
+    which opens the .apworld again for every file.
+    """
+    archive = getattr(__loader__, "archive", None)
+    if not archive:
+        return _parse_json(pkgutil.get_data(__name__, fname))
+
+    member = os.path.relpath(os.path.join(os.path.dirname(__file__), fname), archive).replace(os.sep, "/")
+    zip_file, mapped = _open_archive(archive)
+    info = zip_file.getinfo(member)
+    if info.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        return _parse_json(zip_file.read(info))
+
+    start = _member_data_offset(mapped, info)
+    with memoryview(mapped) as archive_data, archive_data[start:start + info.compress_size] as member_data:
+        if info.compress_type == zipfile.ZIP_STORED:
+            return _parse_json(member_data)
+        return _parse_json(zlib.decompress(member_data, -zlib.MAX_WBITS))
+
+def _member_data_offset(mapped: mmap.mmap, info: zipfile.ZipInfo) -> int:
+    """Internal method: Where the data of a zip member starts in its archive"""
+    # the member's data starts after its local file header, which has its own name and extra field lengths
+    name_length, extra_length = struct.unpack_from("<HH", mapped, info.header_offset + 26)
+    return info.header_offset + 30 + name_length + extra_length
+
+def _freeze_data(data: Any) -> Any:
+    """Internal method: Convert parsed json to read-only views, dicts become MappingProxyType and lists become tuples"""
+    if isinstance(data, dict):
+        return MappingProxyType({key: _freeze_data(value) for key, value in data.items()})
+    if isinstance(data, list):
+        return tuple(_freeze_data(value) for value in data)
+    return data
+
 # blatantly copied from the minecraft ap world because why not
-def load_data_file(*args) -> dict:
+def load_data_file(*args, read_only: bool = False) -> dict:
+    """Load a json file from the data folder of this apworld\n
+    Every call returns a freshly parsed copy made of plain dicts and lists\n
+    Use 'read_only=True' to get the parsed file cached for the whole process instead, it's shared by every caller
+    so it's read-only (dicts as MappingProxyType, lists as tuples)
+    """
     fname = "/".join(["data", *args])
 
+    if read_only and fname in _data_file_cache:
+        return _data_file_cache[fname]
+
     try:
-        filedata = json.loads(pkgutil.get_data(__name__, fname).decode())
-    except:
+        filedata = _parse_data_file(fname)
+    except (OSError, KeyError, ValueError): # missing (KeyError in a .apworld) or invalid json, DataValidation reports the empty tables
         filedata = []
 
+    if read_only:
+        filedata = _data_file_cache[fname] = _freeze_data(filedata)
     return filedata
 
+def clear_data_file_cache() -> None:
+    """Forget every file load_data_file has cached, so they're parsed again"""
+    _data_file_cache.clear()
+
 def load_data_csv(*args) -> list[dict]:
     fname = "/".join(["data", *args])
 
     try:
         lines = pkgutil.get_data(__name__, fname).decode().splitlines()
-    except:
+    except (OSError, ValueError):
         lines = []
     filedata = list(csv.DictReader(lines))
 
@@ -63,7 +145,7 @@ def is_category_enabled(multiworld: MultiWorld, player: int, category_name: str)
     if hook_result is not None:
         return hook_result
 
-    category_data = category_table.get(category_name, {})
+    category_data = get_category_settings(category_table, category_name)
     return resolve_yaml_option(multiworld, player, category_data)
 
 def resolve_yaml_option(multiworld: MultiWorld, player: int, data: dict) -> bool:
@@ -130,6 +212,53 @@ def get_items_for_player(multiworld: MultiWorld, player: int, includePrecollecte
         items.extend(multiworld.precollected_items.get(player, []))
     return items
 
+def get_item_counts_vector(multiworld: MultiWorld, player: int, includePrecollected: bool = True, progressionOnly: bool = False) -> array:
+    """Return how many copies of every item the player has, in the row order of Items.item_value_matrix\n
+    Items without a code (events) and items that are not in the item table are not counted
+    """
+    from .Items import item_name_to_index
+    counts = array('q', bytes(8 * len(item_name_to_index)))
+    for item in get_items_for_player(multiworld, player, includePrecollected):
+        if item.code is None:
+            continue
+        if progressionOnly and ItemClassification.progression not in item.classification:
+            continue
+        index = item_name_to_index.get(item.name)
+        if index is not None:
+            counts[index] += 1
+    return counts
+
+def get_total_item_value(world: World, multiworld: MultiWorld, value: str, player: Optional[int] = None, counts: Optional[array] = None) -> int:
+    """Return the sum of a specific value type over every copy of every item the player has, including starting items\n
+    'counts' can be a vector from get_item_counts_vector to reuse when summing multiple values
+    """
+    from .Items import item_value_matrix
+    if player is None:
+        player = world.player
+
+    column = item_value_matrix.get(value.lower().strip())
+    if column is None:
+        return 0
+
+    if counts is None:
+        counts = get_item_counts_vector(multiworld, player, True)
+    return sum(map(mul, counts, column))
+
+def _get_item_value_cache_for_player(world: World, player: int, counts: array) -> dict[str, dict[str, int]]:
+    """Internal method: Return the player's item value cache.
+    \nThe cache is emptied whenever the player's item counts differ from the ones it was filled with.
+    """
+    if not hasattr(world, 'item_values'): #Cache of just the item values
+        world.item_values = {}
+    if not hasattr(world, 'item_values_counts'): #Item counts the cache was filled with
+        world.item_values_counts = {}
+
+    if world.item_values_counts.get(player) != counts:
+        world.item_values[player] = {}
+        world.item_values_counts[player] = counts
+
+    return world.item_values.setdefault(player, {})
+
 def reset_specific_item_value_cache_for_player(world: World, value: str, player: Optional[int] = None) -> dict[str, int]:
     if player is None:
         player = world.player
@@ -144,62 +273,58 @@ def get_items_with_value(world: World, multiworld: MultiWorld, value: str, playe
     """Return a dict of every items with a specific value type present in their respective 'value' dict\n
     Output in the format 'Item Name': 'value count'\n
     Keep a cache of the result, it can be skipped with 'skipCache == True'\n
-    To force a Reset of the player's cache of a value use either reset_specific_item_value_cache_for_player or reset_item_value_cache_for_player
+    The cache is reset automatically when the player's items change,
+    to force a Reset of the player's cache of a value use either reset_specific_item_value_cache_for_player or reset_item_value_cache_for_player
     """
+    from .Items import item_table, item_value_matrix
     if player is None:
         player = world.player
 
-    player_items = get_items_for_player(multiworld, player, True)
+    counts = get_item_counts_vector(multiworld, player, True)
     # Just a small check to prevent caching {} if items don't exist yet
-    if not player_items:
+    if not any(counts):
         return {value: -1}
 
     value = value.lower().strip()
 
     if not skipCache:
-        if not hasattr(world, 'item_values'): #Cache of just the item values
-            world.item_values = {}
+        cache = _get_item_value_cache_for_player(world, player, counts)
+        if value in cache:
+            return cache[value]
 
-        if not world.item_values.get(player):
-            world.item_values[player] = {}
+    column = item_value_matrix.get(value)
+    item_with_values = {}
+    if column is not None:
+        item_with_values = {item_table[index]["name"]: column[index]
+                            for index in compress(range(len(counts)), map(mul, counts, column))}
 
-    if value not in world.item_values.get(player, {}).keys() or skipCache:
-        item_with_values = {i.name: world.item_name_to_item[i.name]['value'].get(value, 0)
-                            for i in player_items if i.code is not None
-                            and i.name in world.item_name_groups.get(f'has_{value}_value', [])}
-        if skipCache:
-            return item_with_values
-        world.item_values[player][value] = item_with_values
-    return world.item_values[player].get(value)
+    if not skipCache:
+        cache[value] = item_with_values
+    return item_with_values
 
 
 def filter_used_regions(player_regions: dict|list) -> set:
     """Return a set of regions that are actually used in Generation. It includes region that have no locations but are required by other regions\n
     The dict version of the player_regions must be in the format: dict(region name str: region)
     """
-    used_regions = set()
-
     if isinstance(player_regions, list):
         player_regions = {r.name: r for r in player_regions}
 
     #Grab all the player's regions and take note of those with locations
-    for region in player_regions.values():
-        if region.locations:
-            used_regions.add(region)
-
-    #Check every known region with location for parent regions
-    checked_parent = []
-    for region in set(used_regions):
-        def checkParent(parent_region):
-            if parent_region.name in checked_parent: #dont check a region twice
-                return
-            checked_parent.append(parent_region.name)
+    used_regions = {region for region in player_regions.values() if region.locations}
+
+    #Walk the entrances back from every region with locations to find their parent regions
+    checked_parent = {region.name for region in used_regions}
+    to_check = deque(used_regions)
+    while to_check:
+        region = to_check.popleft()
+        for entrance in region.entrances:
+            parent_region = entrance.parent_region
+            if parent_region.name in checked_parent or not player_regions.get(parent_region.name): #dont check a region twice
+                continue
+            checked_parent.add(parent_region.name)
             used_regions.add(parent_region)
-            for entrance in parent_region.entrances:
-                if player_regions.get(entrance.parent_region.name):
-                    checkParent(entrance.parent_region)
-            return
-        checkParent(region)
+            to_check.append(parent_region)
     return used_regions
 
 def convert_to_long_string(input: str | list[str]) -> str:
@@ -232,15 +357,18 @@ def format_state_prog_items_key(category: str|ProgItemsCat ,key: str) -> str:
 
     return f"MANUAL_{cat_key}_{format_to_valid_identifier(key.lower())}"
 
-def convert_string_to_type(input: str, target_type: type) -> Any:
-    """Take a string and attempt to convert it to {target_type}
-    \ntarget_type can be a single type(ex. str), an union (int|str), an Optional type (Optional[str]) or a combo of any of those (Optional[int|str])
-    \nSpecial logic:
-    - When target_type is Optional or contains None: it will check if input.lower() is "none"
-    - When target_type contains bool: it will check if input.lower() is "true", "1", "false" or "0"
-    - If bool is the last type in target_type it also run the input directly through bool(input) if previous fails
-    \nif you want this to possibly fail without Exceptions include str in target_type, your input should get returned if all the other conversions fails
-    """
+# Unions compare equal regardless of their order (int|bool == bool|int) but are tried in order, so the keys include their args
+_conversion_plans: dict[tuple[Any, tuple], tuple] = {}
+_converted_values: dict[tuple[str, Any, tuple], Any] = {}
+_immutable_converted_types = (type(None), bool, int, float, complex, str, bytes, tuple, frozenset)
+
+def _get_conversion_plan(target_type: Any) -> tuple:
+    """Internal method: Return the ordered types convert_string_to_type tries for {target_type}, flattening it only once per target_type"""
+    plan_key = (target_type, get_args(target_type))
+    plan = _conversion_plans.get(plan_key)
+    if plan is not None:
+        return plan
+
     def checktype(target_type, found_types: list):
         if issubclass(type(target_type), type): #is it a single type (str, list, etc)
             if target_type not in found_types:
@@ -256,7 +384,7 @@ def convert_string_to_type(input: str, target_type: type) -> Any:
                 checktype(arg, found_types)
 
         else:
-            raise Exception(f"'{value}' cannot be converted to {target_type} since its not a supported type \nAsk about it in #Manual-support and it might be added.")
+            raise Exception(f"Values cannot be converted to {target_type} since its not a supported type \nAsk about it in #Manual-support and it might be added.")
 
     found_types = []
     checktype(target_type, found_types)
@@ -265,6 +393,37 @@ def convert_string_to_type(input: str, target_type: type) -> Any:
         found_types.remove(str)
         found_types.append(str)
 
+    plan = tuple(found_types)
+    _conversion_plans[plan_key] = plan
+    return plan
+
+def convert_string_to_type(input: str, target_type: type) -> Any:
+    """Take a string and attempt to convert it to {target_type}
+    \ntarget_type can be a single type(ex. str), an union (int|str), an Optional type (Optional[str]) or a combo of any of those (Optional[int|str])
+    \nSpecial logic:
+    - When target_type is Optional or contains None: it will check if input.lower() is "none"
+    - When target_type contains bool: it will check if input.lower() is "true", "1", "false" or "0"
+    - If bool is the last type in target_type it also run the input directly through bool(input) if previous fails
+    \nif you want this to possibly fail without Exceptions include str in target_type, your input should get returned if all the other conversions fails
+    \nSuccessful conversions to immutable (hashable) values are remembered, so converting the same input to the same type again is a single lookup
+    """
+    cache_key = (input, target_type, get_args(target_type))
+    if cache_key in _converted_values:
+        return _converted_values[cache_key]
+
+    result = _convert_string_with_plan(input, target_type, _get_conversion_plan(target_type))
+
+    if not isinstance(result, _immutable_converted_types):
+        return result # mutable results (list, dict, set) are converted fresh every time
+    try:
+        hash(result) # a tuple can still hold mutable values
+    except TypeError:
+        return result
+    _converted_values[cache_key] = result
+    return result
+
+def _convert_string_with_plan(input: str, target_type: Any, found_types: tuple) -> Any:
+    """Internal method: Convert {input} by trying each type of {found_types} in order, see convert_string_to_type"""
     value = input.strip()
     i = 0
     errors = []
@@ -316,3 +475,12 @@ def convert_string_to_type(input: str, target_type: type) -> Any:
 
     newline = "\n"
     raise Exception(f"'{value}' could not be converted to {target_type}, here's the conversion failure message(s):\n\n{newline.join([' - ' + str(validation_error) for validation_error in errors])}\n\n")
+
+def _passthrough_hook(value: Any, *args) -> Any:
+    return value
+
+def is_passthrough_hook(hook: Callable) -> bool:
+    """Check if a hook only returns its first argument, like the before_create_item/after_create_item of the hooks template,
+    in which case calling it can be skipped"""
+    code = getattr(hook, "__code__", None)
+    return code is not None and code.co_code == _passthrough_hook.__code__.co_code
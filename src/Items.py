@@ -1,68 +1,67 @@
+from array import array
 from BaseClasses import Item
-from .Data import item_table
-from .Game import filler_item_name, starting_index
+from .Bundle import build_name_groups, exported_name_groups
+from .Categories import is_exported_name_group
+from .Data import LazyDict, bundle, category_table, datapackage_index, item_table
+from .Profiling import profile_stage
 
 
 ######################
 # Generate item lookups
 ######################
 
-item_id_to_name: dict[int, str] = {}
-item_name_to_item: dict[str, dict] = {}
-item_name_groups: dict[str, str] = {}
 advancement_item_names: set[str] = set()
-lastItemId = -1
-
-count = starting_index
-
-# add the filler item to the list of items for lookup
-if filler_item_name:
-    item_table.append({
-        "name": filler_item_name
-    })
-
-# add sequential generated ids to the lists
-for key, val in enumerate(item_table):
-    if "id" in item_table[key]:
-        item_id = item_table[key]["id"]
-        if item_id >= count:
-            count = item_id
-        else:
-            raise ValueError(f"{item_table[key]['name']} has an invalid ID. ID must be at least {count + 1}")
-
-    item_table[key]["id"] = count
-    item_table[key]["progression"] = val["progression"] if "progression" in val else False
-    if isinstance(val.get("category", []), str):
-        item_table[key]["category"] = [val["category"]]
-        
-    count += 1
-
-for item in item_table:
-    item_name = item["name"]
-    item_id_to_name[item["id"]] = item_name
-    item_name_to_item[item_name] = item
-
-    if item["id"] is not None:
-        lastItemId = max(lastItemId, item["id"])
-
-    for c in item.get("category", []):
-        if c not in item_name_groups:
-            item_name_groups[c] = []
-        item_name_groups[c].append(item_name)
-
-    #Just lowercase the values here to remove all the .lower.strip down the line
-    item['value'] = {k.lower().strip(): v
-                     for k, v in item.get('value', {}).items()}
-
-    for v in item.get("value", {}).keys():
-        group_name = f"has_{v}_value"
-        if group_name not in item_name_groups:
-            item_name_groups[group_name] = []
-        item_name_groups[group_name].append(item_name)
+
+with profile_stage("item lookups"):
+    if datapackage_index: # the index has everything the world class needs, so the item table isn't loaded here
+        item_id_to_name: dict[int, str] = datapackage_index["items"]["id_to_name"]
+        item_name_groups: dict[str, str] = datapackage_index["items"]["name_groups"]
+        has_trap_items: bool = datapackage_index["items"]["has_traps"]
+    else:
+        item_id_to_name = {item["id"]: item["name"] for item in item_table}
+        item_name_groups = exported_name_groups(build_name_groups(item_table, value_groups=True),
+                                                lambda group_name: is_exported_name_group(category_table, group_name))
+        has_trap_items = any(item.get("trap") for item in item_table)
+
+lastItemId = max((id for id in item_id_to_name if id is not None), default=-1)
 
 item_id_to_name[None] = "__Victory__"
 item_name_to_id = {name: id for id, name in item_id_to_name.items()}
 
+def _load_item_name_to_item() -> dict[str, dict]:
+    return {item["name"]: item for item in item_table}
+
+def _load_item_category_index() -> dict[str, list[str]]:
+    if bundle and "item_category_index" in bundle:
+        return bundle.pop("item_category_index")
+    return build_name_groups(item_table)
+
+item_name_to_item: dict[str, dict] = LazyDict(_load_item_name_to_item)
+# The names of the items of every category, in table order, including the categories that aren't exported as item_name_groups
+item_category_index: dict[str, list[str]] = LazyDict(_load_item_category_index)
+
+
+######################
+# Item value matrix
+######################
+
+def _load_item_name_to_index() -> dict[str, int]:
+    return {item["name"]: index for index, item in enumerate(item_table)}
+
+def _load_item_value_matrix() -> dict[str, array]:
+    item_value_matrix: dict[str, array] = {}
+    for index, item in enumerate(item_table):
+        for v, amount in item["value"].items():
+            if v not in item_value_matrix:
+                item_value_matrix[v] = array('q', bytes(8 * len(item_table)))
+            item_value_matrix[v][index] = int(amount)
+    return item_value_matrix
+
+# The row of every item in item_value_matrix, which is also its position in item_table
+item_name_to_index: dict[str, int] = LazyDict(_load_item_name_to_index)
+# One column per (lowercased) value key, holding the value of every item in item_table (0 when it has none)
+item_value_matrix: dict[str, array] = LazyDict(_load_item_value_matrix)
+
 
 ######################
 # Item classes
@@ -1,60 +1,63 @@
 from BaseClasses import Location
-from .Data import location_table
-from .Game import starting_index
+from .Bundle import build_name_groups, exported_name_groups, get_victory_names
+from .Categories import is_exported_name_group
+from .Data import LazyDict, bundle, category_table, datapackage_index, location_table
+from .DataValidation import DataValidation
+from .Profiling import profile_stage
 
 
 ######################
 # Generate location lookups
 ######################
 
-count = starting_index
-victory_names: list[str] = []
-
-# add sequential generated ids to the lists
-for key, _ in enumerate(location_table):
-    if "victory" in location_table[key] and location_table[key]["victory"]:
-        victory_names.append(location_table[key]["name"])
-
-    if "id" in location_table[key]:
-        item_id = location_table[key]["id"]
-        if item_id >= count:
-            count = item_id
-        else:
-            raise ValueError(f"{location_table[key]['name']} has an invalid ID. ID must be at least {count + 1}")
-
-    location_table[key]["id"] = count
-
-    if "region" not in location_table[key]:
-        location_table[key]["region"] = "Manual" # all locations are in the same region for Manual
-
-    if isinstance(location_table[key].get("category", []), str):
-        location_table[key]["category"] = [location_table[key]["category"]]
-
-    count += 1
-
-if not victory_names:
-    # Add the game completion location, which will have the Victory item assigned to it automatically
-    location_table.append({
-        "id": count + 1,
-        "name": "__Manual Game Complete__",
-        "region": "Manual",
-        "requires": []
-        # "category": custom_victory_location["category"] if "category" in custom_victory_location else []
-    })
-    victory_names.append("__Manual Game Complete__")
-
-location_id_to_name: dict[int, str] = {}
-location_name_to_location: dict[str, dict] = {}
-location_name_groups: dict[str, list[str]] = {}
-
-for item in location_table:
-    location_id_to_name[item["id"]] = item["name"]
-    location_name_to_location[item["name"]] = item
-
-    for c in item.get("category", []):
-        if c not in location_name_groups:
-            location_name_groups[c] = []
-        location_name_groups[c].append(item["name"])
+with profile_stage("location lookups"):
+    if datapackage_index: # the index has everything the world class needs, so the location table isn't loaded here
+        victory_names: list[str] = datapackage_index["locations"]["victory_names"]
+        location_id_to_name: dict[int, str] = datapackage_index["locations"]["id_to_name"]
+        location_name_groups: dict[str, list[str]] = datapackage_index["locations"]["name_groups"]
+    else:
+        victory_names = get_victory_names(location_table)
+        location_id_to_name = {location["id"]: location["name"] for location in location_table}
+        location_name_groups = exported_name_groups(build_name_groups(location_table),
+                                                    lambda group_name: is_exported_name_group(category_table, group_name))
+
+def _load_location_name_to_location() -> dict[str, dict]:
+    return {location["name"]: location for location in location_table}
+
+def _load_location_category_index() -> dict[str, list[str]]:
+    if bundle and "location_category_index" in bundle: # doesn't load the location shards
+        return bundle.pop("location_category_index")
+    return build_name_groups(location_table)
+
+location_name_to_location: dict[str, dict] = LazyDict(_load_location_name_to_location)
+# The names of the locations of every category, in table order, including the categories that aren't exported as location_name_groups
+location_category_index: dict[str, list[str]] = LazyDict(_load_location_category_index)
+
+def group_locations_by_region(table: list) -> dict[str, list[dict]]:
+    """The locations of a table grouped by their region, in table order"""
+    locations_by_region: dict[str, list[dict]] = {}
+    for location in table:
+        if "region" in location:
+            locations_by_region.setdefault(location["region"], []).append(location)
+    return locations_by_region
+
+def _load_location_region_index() -> dict[str, list[dict]]:
+    return group_locations_by_region(location_table)
+
+# The locations of every region, in table order
+location_region_index: dict[str, list[dict]] = LazyDict(_load_location_region_index)
+
+# The highest count asked for each value by the {ItemValue(value:count)} of a location's requires, by name.
+# Only filled for the locations a player has, as they're checked, so the locations of the other shards aren't loaded.
+location_value_demand: dict[str, dict[str, int]] = {}
+
+def get_location_value_demand(location: dict) -> dict[str, int]:
+    """What the {ItemValue(value:count)} of a location's requires ask for (see DataValidation.getItemValueDemand),
+    worked out the first time it's asked for and shared by every player"""
+    demand = location_value_demand.get(location["name"])
+    if demand is None:
+        demand = location_value_demand[location["name"]] = DataValidation.getItemValueDemand(location.get("requires"))
+    return demand
 
 
 # location_id_to_name[None] = "__Manual Game Complete__"
@@ -422,9 +422,9 @@ class ManualContext(SuperContext):
                     if hint["finding_player"] == self.ctx.slot:
                         if hint["location"] in self.ctx.missing_locations:
                             location = self.ctx.get_location_by_id(hint["location"])
-                            location["category"] = location.get("category", [])
-                            if "(Hinted)" not in location["category"]:
-                                location["category"].append("(Hinted)")
+                            # a new list, the world's locations with the same categories share one
+                            if "(Hinted)" not in location.get("category", []):
+                                location["category"] = [*location.get("category", []), "(Hinted)"]
                                 rebuild = True
 
                 if rebuild:
@@ -441,6 +441,7 @@ class ManualContext(SuperContext):
                 self.request_update_tracker_and_locations_table() # if we want search to be "snappier", we can just make this update
 
             def build_tracker_and_locations_table(self):
+                from .Categories import get_category_settings
                 self.controls_panel.clear_widgets()
                 self.tracker_and_locations_panel.clear_widgets()
 
@@ -470,7 +471,7 @@ class ManualContext(SuperContext):
                 for item in self.ctx.item_table.values() or AutoWorldRegister.world_types[self.ctx.game].item_name_to_item.values():
                     if "category" in item and len(item["category"]) > 0:
                         for category in item["category"]:
-                            category_settings = self.ctx.category_table.get(category) or getattr(AutoWorldRegister.world_types[self.ctx.game], "category_table", {}).get(category, {})
+                            category_settings = get_category_settings(self.ctx.category_table, category) or get_category_settings(getattr(AutoWorldRegister.world_types[self.ctx.game], "category_table", {}), category)
                             if "hidden" in category_settings and category_settings["hidden"]:
                                 continue
                             if category not in self.item_categories:
@@ -495,7 +496,7 @@ class ManualContext(SuperContext):
 
                     if "category" in location and len(location["category"]) > 0:
                         for category in location["category"]:
-                            category_settings = self.ctx.category_table.get(category) or getattr(AutoWorldRegister.world_types[self.ctx.game], "category_table", {}).get(category, {})
+                            category_settings = get_category_settings(self.ctx.category_table, category) or get_category_settings(getattr(AutoWorldRegister.world_types[self.ctx.game], "category_table", {}), category)
                             if "hidden" in category_settings and category_settings["hidden"]:
                                 continue
                             if category not in self.location_categories:
@@ -3,6 +3,7 @@ from BaseClasses import Tutorial
 from worlds.AutoWorld import World, WebWorld
 from .Data import meta_table
 from .Helpers import convert_to_long_string
+from .Profiling import profile_stage
 
 ##############
 # Meta Classes
@@ -28,7 +29,8 @@ def set_world_description(base_doc: str) -> str:
 
 
 def set_world_webworld(web: WebWorld) -> WebWorld:
-    from .Options import make_options_group
+    with profile_stage("Options.py"): # the options are first imported here
+        from .Options import make_options_group
     if meta_table.get("docs", {}).get("web", {}):
         Web_Config = meta_table["docs"]["web"]
 
@@ -1,10 +1,10 @@
 from Options import PerGameCommonOptions, FreeText, Toggle, DefaultOnToggle, Choice, TextChoice, Range, NamedRange, DeathLink, \
     OptionGroup, StartInventoryPool, Visibility, item_and_loc_options, Option
 from .hooks.Options import before_options_defined, after_options_defined, before_option_groups_created, after_option_groups_created
-from .Data import category_table, game_table, option_table
+from .Data import category_table, datapackage_index, game_table, option_table
 from .Helpers import convert_to_long_string, format_to_valid_identifier
 from .Locations import victory_names
-from .Items import item_table
+from .Items import has_trap_items
 from .Game import starting_items
 
 from dataclasses import make_dataclass
@@ -71,7 +71,7 @@ if len(victory_names) > 1:
     manual_options['goal'].__doc__ = "Choose your victory condition."
 
 
-if any(item.get('trap') for item in item_table):
+if has_trap_items:
     manual_options["filler_traps"] = FillerTrapPercent
 
 if game_table.get("death_link"):
@@ -195,8 +195,13 @@ for option_name, option in option_table.get('user', {}).items():
 # category and starting_items options
 ######################
 
-for category in category_table:
-    for option_name in category_table[category].get("yaml_option", []):
+if datapackage_index:
+    category_yaml_options = datapackage_index["category_yaml_options"]
+else:
+    category_yaml_options = {category: category_table[category].get("yaml_option", []) for category in category_table}
+
+for category in category_yaml_options:
+    for option_name in category_yaml_options[category]:
         if option_name[0] == "!":
             option_name = option_name[1:]
         option_name = format_to_valid_identifier(option_name)
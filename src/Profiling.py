@@ -0,0 +1,68 @@
+# Opt-in import profiling
+#
+# Set MANUAL_PROFILE_IMPORT to time every stage of importing the apworld (loading each data file, its after_load_* hook,
+# the json validation checks, id assignment, the options and the launcher component):
+# - MANUAL_PROFILE_IMPORT=1 logs a table of the stages once the apworld is imported
+# - MANUAL_PROFILE_IMPORT=some/file.json writes every stage to that file instead, when the process exits
+# Stages that are only reached after the import (like the big tables being loaded for generation) are logged/written at exit.
+
+import atexit
+import json
+import logging
+import os
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator
+
+PROFILE_ENV_VAR = "MANUAL_PROFILE_IMPORT"
+
+_profile_setting = os.environ.get(PROFILE_ENV_VAR, "")
+profiling_enabled = _profile_setting.lower() not in ("", "0", "false")
+
+_stages: list[dict] = []
+_depth = 0
+_importing = True
+
+@contextmanager
+def profile_stage(name: str) -> Iterator[None]:
+    """Record how long the code in this 'with' takes as a stage of the import, does nothing unless profiling is enabled"""
+    global _depth
+    if not profiling_enabled:
+        yield
+        return
+
+    stage = {"stage": name, "depth": _depth, "during_import": _importing, "seconds": 0.0}
+    _stages.append(stage) # added before running so nested stages are listed after their parent
+    _depth += 1
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        stage["seconds"] = perf_counter() - start
+        _depth -= 1
+
+def format_profile(stages: list[dict]) -> str:
+    lines = [f"{'Stage':<60} {'ms':>10}"]
+    for stage in stages:
+        lines.append(f"{'  ' * stage['depth'] + stage['stage']:<60} {stage['seconds'] * 1000:>10.2f}")
+    return "\n".join(lines)
+
+def _write_profile():
+    if _profile_setting.lower().endswith(".json"):
+        with open(_profile_setting, "w", encoding="utf-8") as file:
+            json.dump({"stages": _stages}, file, indent=2)
+    else:
+        later_stages = [stage for stage in _stages if not stage["during_import"]]
+        if later_stages:
+            logging.info("Manual: stages after the import\n%s" % format_profile(later_stages))
+
+def finish_import_profile():
+    """Called at the end of the apworld's import, reports what was recorded so far"""
+    global _importing
+    if not profiling_enabled or not _importing:
+        return
+
+    _importing = False
+    if not _profile_setting.lower().endswith(".json"):
+        logging.info("Manual: import profile\n%s" % format_profile(_stages))
+    atexit.register(_write_profile)
@@ -1,26 +1,61 @@
 from BaseClasses import Entrance, MultiWorld, Region
 from .Helpers import is_category_enabled, is_location_enabled
-from .Data import region_table
-from .Locations import ManualLocation, location_name_to_location
+from .Data import LazyDict, location_table, region_table
+from .DataValidation import DataValidation
+from .Locations import ManualLocation, group_locations_by_region, location_region_index
 from worlds.AutoWorld import World
 
 
-if not region_table:
-    region_table = {}
+def build_region_map(region_table: dict) -> dict:
+    """The regions of regions.json, and the Manual region that connects to the starting ones"""
+    if not region_table:
+        region_table = {}
 
-regionMap = { **region_table }
-starting_regions = [ name for name in regionMap if "starting" in regionMap[name].keys() and regionMap[name]["starting"] ]
+    regionMap = { **region_table }
+    starting_regions = [ name for name in regionMap if "starting" in regionMap[name].keys() and regionMap[name]["starting"] ]
 
-if len(starting_regions) == 0:
-    starting_regions = region_table.keys() # the Manual region connects to all user-defined regions automatically if you specify no starting regions
+    if len(starting_regions) == 0:
+        starting_regions = region_table.keys() # the Manual region connects to all user-defined regions automatically if you specify no starting regions
 
-regionMap["Manual"] = {
-    "requires": [],
-    "connects_to": starting_regions
-}
+    regionMap["Manual"] = {
+        "requires": [],
+        "connects_to": starting_regions
+    }
+    return regionMap
+
+regionMap = build_region_map(region_table)
+starting_regions = regionMap["Manual"]["connects_to"]
+
+def _load_region_value_demand() -> dict[str, dict]:
+    region_value_demand = {}
+    for region_name, region in region_table.items():
+        demand = {
+            "requires": DataValidation.getItemValueDemand(region.get("requires")),
+            "entrance_requires": {},
+            "exit_requires": {}
+        }
+        for requires_key in ("entrance_requires", "exit_requires"):
+            for other_region, requires in region.get(requires_key, {}).items():
+                requires_demand = DataValidation.getItemValueDemand(requires)
+                if requires_demand:
+                    demand[requires_key][other_region] = requires_demand
+
+        if demand["requires"] or demand["entrance_requires"] or demand["exit_requires"]:
+            region_value_demand[region_name] = demand
+    return region_value_demand
+
+# What the {ItemValue(value:count)} of a region's requires, entrance_requires and exit_requires ask for (see DataValidation.getItemValueDemand),
+# for the regions that have any
+region_value_demand: dict[str, dict] = LazyDict(_load_region_value_demand)
 
 
 def create_regions(world: World, multiworld: MultiWorld, player: int):
+    # the locations of each region, grouped once for every player unless the world has its own location table
+    if world.location_table is location_table:
+        locations_by_region = location_region_index
+    else:
+        locations_by_region = group_locations_by_region(world.location_table)
+
     # Create regions and assign locations to each region
     for region in regionMap:
         if "connects_to" not in regionMap[region]:
@@ -32,11 +67,8 @@ def create_regions(world: World, multiworld: MultiWorld, player: int):
         if not exit_array:
             exit_array = None
 
-        locations = []
-        for location in world.location_table:
-            if "region" in location and location["region"] == region:
-                if is_location_enabled(multiworld, player, location):
-                    locations.append(location["name"])
+        locations = [location["name"] for location in locations_by_region.get(region, [])
+                     if is_location_enabled(multiworld, player, location)]
 
         new_region = create_region(world, multiworld, player, region, locations, exit_array)
         multiworld.regions += [new_region]
@@ -57,16 +89,22 @@ def create_region(world: World, multiworld: MultiWorld, player: int, name: str,
     ret = Region(name, player, multiworld)
 
     if locations:
-        for location in locations:
-            loc_id = world.location_name_to_id.get(location, 0)
-            locationObj = ManualLocation(player, location, loc_id, ret)
-            if location_name_to_location[location].get('prehint'):
-                world.options.start_location_hints.value.add(location)
-            ret.locations.append(locationObj)
+        location_name_to_id = world.location_name_to_id
+        ret.locations.extend([ManualLocation(player, location, location_name_to_id.get(location, 0), ret) for location in locations])
+
+        prehint_locations = get_prehint_locations(world)
+        if prehint_locations:
+            world.options.start_location_hints.value.update([location for location in locations if location in prehint_locations])
     if exits:
         for exit in exits:
             ret.exits.append(Entrance(player, getConnectionName(name, exit), ret))
     return ret
 
+def get_prehint_locations(world: World) -> set[str]:
+    """The names of the locations of world.location_table that are hinted from the start, worked out once for each world"""
+    if not hasattr(world, 'prehint_locations'): #Only the world's own locations, so the location shards it doesn't use aren't loaded
+        world.prehint_locations = {location["name"] for location in world.location_table if location.get("prehint")}
+    return world.prehint_locations
+
 def getConnectionName(entranceName: str, exitName: str):
     return entranceName + "To" + exitName
@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING, Optional
 from enum import IntEnum
 from operator import eq, ge, le
 
+from .Items import item_category_index
 from .Regions import regionMap
 from .hooks import Rules
 from .Helpers import clamp, is_item_enabled, is_option_enabled, get_option_value, convert_string_to_type,\
@@ -178,7 +179,7 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
             total = 0
 
             if require_type == 'category':
-                category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
+                category_items = [world.item_name_to_item[name] for name in item_category_index.get(item_name, [])]
                 category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
                 if item_count.lower() == 'all':
                     item_count = category_items_counts
@@ -432,7 +433,7 @@ def OptOne(world: World, item: str, items_counts: Optional[dict] = None):
     if require_type == 'category':
         if item_count.isnumeric():
             #Only loop if we can use the result to clamp
-            category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
+            category_items = [world.item_name_to_item[name] for name in item_category_index.get(item_name, [])]
             category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
             item_count = clamp(int(item_count), 0, category_items_counts)
         return f"|@{item_name}:{item_count}|"
@@ -0,0 +1,113 @@
+# Location templates
+#
+# Instead of a location, an entry of locations.json can be a template that makes one location per row of a data source:
+# {
+#     "template": {
+#         "source": "song_goals.json",
+#         "locations": [
+#             {
+#                 "where": {"kind": "song"},
+#                 "for_each": {"goal": ["Track Clear", "AA Rank"]},
+#                 "name": "{identifier} ({goal})",
+#                 "requires": "|@Song Number {number}|",
+#                 "category": ["Goals", "{identifier}", {"each": "navigators", "as": "navigator", "format": "({navigator}) {identifier}"}]
+#             }
+#         ]
+#     }
+# }
+# - "source" is a json file in data/ holding a list of objects (or {"data": [...]}), every row's fields can be used as
+#   {field} in the strings of the locations, along with {_index}, the row's position in the source
+# - for each row, in order, every location of "locations" whose "where" matches the row is made, once per combination
+#   of its optional "for_each" values. "where" values can be a list of the accepted values
+# - the strings are python format strings, so a literal { or } is written {{ or }}, the strings in lists and dicts
+#   (like "value": {"chain": "{number}"}) are filled too, and every location gets its own copy of them
+# - in a list, {"each": field, "as": name, "format": string} adds one string per value of the row's list field,
+#   as a string value, the same with a "join" separator joins them into one string
+#
+# Only the standard library is used here so the build script can load this file without Archipelago.
+
+from collections.abc import Mapping
+from itertools import product
+from typing import Any, Callable
+
+
+def is_location_template(entry: Any) -> bool:
+    return isinstance(entry, Mapping) and "template" in entry
+
+
+def get_template_sources(location_table: list) -> list[str]:
+    """The data files the templates of location_table are made from"""
+    return [entry["template"]["source"] for entry in location_table if is_location_template(entry)]
+
+
+def expand_location_templates(location_table: list, load_source: Callable[[str], Any]) -> list:
+    """Replace every template of location_table with the locations it makes, load_source(filename) returning the parsed data file"""
+    if not any(is_location_template(entry) for entry in location_table):
+        return location_table
+
+    expanded = []
+    for entry in location_table:
+        if is_location_template(entry):
+            expanded.extend(_expand_template(entry["template"], load_source))
+        else:
+            expanded.append(entry)
+    return expanded
+
+
+def _expand_template(template: dict, load_source: Callable[[str], Any]) -> list[dict]:
+    source = template["source"]
+    rows = load_source(source)
+    if isinstance(rows, Mapping):
+        rows = rows.get("data", [])
+
+    patterns = template.get("locations", [])
+    locations = []
+
+    for index, row in enumerate(rows):
+        for pattern in patterns:
+            if not _matches(row, pattern.get("where", {})):
+                continue
+
+            for_each = pattern.get("for_each", {})
+            for values in product(*for_each.values()):
+                variables = {"_index": index, **row, **dict(zip(for_each.keys(), values))}
+                try:
+                    locations.append({key: _fill(value, variables)
+                                      for key, value in pattern.items() if key not in ("where", "for_each")})
+                except KeyError as e:
+                    raise ValueError(f"A location template over {source} uses {e}, which isn't a field of row {index} or one of its 'for_each'") from e
+    return locations
+
+
+def _matches(row: dict, where: dict) -> bool:
+    for field, accepted in where.items():
+        value = row.get(field)
+        if isinstance(accepted, list):
+            if value not in accepted:
+                return False
+        elif value != accepted:
+            return False
+    return True
+
+
+def _fill(value: Any, variables: dict) -> Any:
+    if isinstance(value, str):
+        return value.format_map(variables)
+    if isinstance(value, dict):
+        if "each" in value:
+            return value.get("join", "").join(_fill_each(value, variables))
+        return {key: _fill(element, variables) for key, element in value.items()}
+    if isinstance(value, list):
+        filled = []
+        for element in value:
+            if isinstance(element, dict) and "each" in element:
+                filled.extend(_fill_each(element, variables))
+            else:
+                filled.append(_fill(element, variables))
+        return filled
+    return value
+
+
+def _fill_each(each: dict, variables: dict) -> list[str]:
+    name = each.get("as", each["each"])
+    return [each["format"].format_map({**variables, name: item}) for item in variables[each["each"]]]
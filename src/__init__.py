@@ -1,4 +1,5 @@
 from base64 import b64encode
+from collections import Counter, deque
 import logging
 import os
 import json
@@ -13,14 +14,16 @@ from .Data import item_table, location_table, region_table, category_table
 from .Game import game_name, filler_item_name, starting_items
 from .Meta import world_description, world_webworld, enable_region_diagram
 from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names
-from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
+from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups, item_category_index
 from .DataValidation import runGenerationDataValidation, runPreFillDataValidation
+from .DevReload import reload_if_changed
 
 from .Regions import create_regions
 from .Items import ManualItem
 from .Rules import set_rules
 from .Options import manual_options_data
-from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat
+from .Profiling import profile_stage, finish_import_profile
+from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat, is_passthrough_hook
 
 from BaseClasses import CollectionState, ItemClassification, Item
 from Options import PerGameCommonOptions
@@ -37,6 +40,10 @@ from .hooks.World import \
     after_collect_item, after_remove_item
 from .hooks.Data import hook_interpret_slot_data
 
+# the item hooks that only return what they're given aren't called, they'd be called for every copy of every item
+_call_before_create_item = not is_passthrough_hook(before_create_item)
+_call_after_create_item = not is_passthrough_hook(after_create_item)
+
 class ManualWorld(World):
     __doc__ = world_description
     game: str = game_name
@@ -89,6 +96,7 @@ class ManualWorld(World):
 
     @classmethod
     def stage_assert_generate(cls, multiworld) -> None:
+        reload_if_changed(cls)
         runGenerationDataValidation()
 
 
@@ -137,9 +145,7 @@ class ManualWorld(World):
             total_created = 0
             if type(configs) is int:
                 total_created = configs
-                for _ in range(configs):
-                    new_item = self.create_item(name)
-                    pool.append(new_item)
+                pool.extend(self.create_item_copies(name, configs))
             elif type(configs) is dict:
                 for cat, count in configs.items():
                     total_created += count
@@ -156,9 +162,7 @@ class ManualWorld(World):
                         except Exception as ex:
                             raise Exception(f"Item override '{cat}' for {name} improperly defined\n\n{type(ex).__name__}:{ex}")
 
-                    for _ in range(count):
-                        new_item = self.create_item(name, true_class)
-                        pool.append(new_item)
+                    pool.extend(self.create_item_copies(name, count, true_class))
             else:
                 raise Exception(f"Item override for {name} improperly defined")
 
@@ -193,6 +197,7 @@ class ManualWorld(World):
         pool = before_create_items_starting(pool, self, self.multiworld, self.player)
 
         items_started: list[Item] = []
+        started_names: set[str] = set()
 
         if starting_items:
             for starting_item_block in starting_items:
@@ -201,35 +206,61 @@ class ManualWorld(World):
                 # if there's a condition on having a previous item, check for any of them
                 # if not found in items started, this starting item rule shouldn't execute, and check the next one
                 if "if_previous_item" in starting_item_block:
-                    matching_items = [item for item in items_started if item.name in starting_item_block["if_previous_item"]]
-
-                    if len(matching_items) == 0:
+                    if started_names.isdisjoint(starting_item_block["if_previous_item"]):
                         continue
 
-                # start with the full pool of items
-                items = pool
+                # the positions in the pool of the items that can be picked, None for the full pool of items
+                picked: Optional[list[int]] = None
 
                 # if the setting lists specific item names, limit the items to just those
                 if "items" in starting_item_block:
-                    items = [item for item in pool if item.name in starting_item_block["items"]]
+                    block_items = set(starting_item_block["items"])
+                    picked = [index for index, item in enumerate(pool) if item.name in block_items]
 
                 # if the setting lists specific item categories, limit the items to ones that have any of those categories
                 if "item_categories" in starting_item_block:
-                    items_in_categories = [item["name"] for item in self.item_name_to_item.values() if "category" in item and len(set(starting_item_block["item_categories"]).intersection(item["category"])) > 0]
-                    items = [item for item in pool if item.name in items_in_categories]
-
-                self.random.shuffle(items)
+                    items_in_categories = {name for category in starting_item_block["item_categories"] for name in item_category_index.get(category, [])}
+                    picked = [index for index, item in enumerate(pool) if item.name in items_in_categories]
+
+                if picked is None:
+                    # the full pool of items is shuffled in place
+                    self.random.shuffle(pool)
+                    if "random" not in starting_item_block:
+                        for starting_item in pool:
+                            items_started.append(starting_item)
+                            started_names.add(starting_item.name)
+                            self.multiworld.push_precollected(starting_item)
+                            pool.remove(starting_item)
+                        continue
+                    picked = list(range(len(pool)))
+                else:
+                    self.random.shuffle(picked)
 
                 # if the setting lists a specific number of random items that should be pulled, only use a subset equal to that number
                 if "random" in starting_item_block:
-                    items = items[0:starting_item_block["random"]]
+                    picked = picked[0:starting_item_block["random"]]
+
+                chosen = [pool[index] for index in picked]
+                chosen_keys = {(item.name, item.player) for item in chosen}
 
-                for starting_item in items:
+                # an item is taken out of the pool by equality, which removes the first item of the pool with the same name
+                positions: dict[tuple[str, int], deque[int]] = {}
+                for index, item in enumerate(pool):
+                    key = (item.name, item.player)
+                    if key in chosen_keys:
+                        positions.setdefault(key, deque()).append(index)
+
+                removed: set[int] = set()
+                for starting_item in chosen:
                     items_started.append(starting_item)
+                    started_names.add(starting_item.name)
                     self.multiworld.push_precollected(starting_item)
-                    pool.remove(starting_item)
+                    removed.add(positions[(starting_item.name, starting_item.player)].popleft())
+
+                if removed:
+                    pool[:] = [item for index, item in enumerate(pool) if index not in removed]
 
-        self.start_inventory = {i.name: items_started.count(i) for i in items_started}
+        self.start_inventory = dict(Counter(item.name for item in items_started))
 
         pool = before_create_items_filler(pool, self, self.multiworld, self.player)
         pool = self.adjust_filler_items(pool, traps)
@@ -240,31 +271,58 @@ class ManualWorld(World):
         self.multiworld.itempool += pool
 
     def create_item(self, name: str, class_override: Optional['ItemClassification']=None) -> Item:
-        name = before_create_item(name, self, self.multiworld, self.player)
+        if _call_before_create_item:
+            name = before_create_item(name, self, self.multiworld, self.player)
 
-        item = self.item_name_to_item[name]
+        classification, code = self.get_item_template(name)
         if class_override is not None:
             classification = class_override
-        else:
-            classification = ItemClassification.filler
 
-            if "trap" in item and item["trap"]:
-                classification |= ItemClassification.trap
+        item_object = ManualItem(name, classification, code, player=self.player)
 
-            if "useful" in item and item["useful"]:
-                classification |= ItemClassification.useful
+        if _call_after_create_item:
+            item_object = after_create_item(item_object, self, self.multiworld, self.player)
 
-            if "progression_skip_balancing" in item and item["progression_skip_balancing"]:
-                classification |= ItemClassification.progression_skip_balancing
-            elif "progression" in item and item["progression"]:
-                classification |= ItemClassification.progression
+        return item_object
 
-        item_object = ManualItem(name, classification,
-                        self.item_name_to_id[name], player=self.player)
+    def create_item_copies(self, name: str, count: int, class_override: Optional['ItemClassification']=None) -> list[Item]:
+        """Create 'count' copies of an item, the same as calling create_item that many times\n
+        When before_create_item does something (it can rename every copy) or create_item was overridden, every copy goes through create_item
+        """
+        if count <= 0:
+            return []
 
-        item_object = after_create_item(item_object, self, self.multiworld, self.player)
+        if _call_before_create_item or type(self).create_item is not ManualWorld.create_item:
+            return [self.create_item(name, class_override) for _ in range(count)]
 
-        return item_object
+        classification, code = self.get_item_template(name)
+        if class_override is not None:
+            classification = class_override
+
+        items = [ManualItem(name, classification, code, player=self.player) for _ in range(count)]
+        if _call_after_create_item:
+            items = [after_create_item(item, self, self.multiworld, self.player) for item in items]
+        return items
+
+    def get_item_template(self, name: str) -> tuple[ItemClassification, Optional[int]]:
+        """Return the classification and id of the item named 'name', from its current flags\n
+        It isn't cached, so flags changed by hooks (or a hot reload, see DevReload.py) apply to the next item created
+        """
+        item = self.item_name_to_item[name]
+        classification = ItemClassification.filler
+
+        if "trap" in item and item["trap"]:
+            classification |= ItemClassification.trap
+
+        if "useful" in item and item["useful"]:
+            classification |= ItemClassification.useful
+
+        if "progression_skip_balancing" in item and item["progression_skip_balancing"]:
+            classification |= ItemClassification.progression_skip_balancing
+        elif "progression" in item and item["progression"]:
+            classification |= ItemClassification.progression
+
+        return classification, self.item_name_to_id[name]
 
     # Item Value need a tweaked collect and remove:
     def collect(self, state: CollectionState, item: Item) -> bool:
@@ -296,7 +354,7 @@ class ManualWorld(World):
         before_generate_basic(self, self.multiworld, self.player)
 
         # Handle item forbidding
-        manual_locations_with_forbid = {location['name']: location for location in location_name_to_location.values() if "dont_place_item" in location or "dont_place_item_category" in location}
+        manual_locations_with_forbid = {location['name']: location for location in self.location_table if "dont_place_item" in location or "dont_place_item_category" in location}
         locations_with_forbid = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_forbid.keys()]
         for location in locations_with_forbid:
             manual_location = manual_locations_with_forbid[location.name]
@@ -312,7 +370,7 @@ class ManualWorld(World):
                 forbid_items_for_player(location, set(forbidden_item_names), self.player)
 
         # Handle specific item placements using fill_restrictive
-        manual_locations_with_placements = {location['name']: location for location in location_name_to_location.values() if "place_item" in location or "place_item_category" in location}
+        manual_locations_with_placements = {location['name']: location for location in self.location_table if "place_item" in location or "place_item_category" in location}
         locations_with_placements = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_placements.keys()]
         for location in locations_with_placements:
             manual_location = manual_locations_with_placements[location.name]
@@ -487,11 +545,12 @@ class ManualWorld(World):
             "game": self.game,
             'player_name': self.multiworld.get_player_name(self.player),
             'player_id': self.player,
-            'items': self.item_name_to_item,
-            'locations': self.location_name_to_location,
+            'items': dict(self.item_name_to_item),
+            'locations': dict(self.location_name_to_location),
             # todo: extract connections out of multiworld.get_regions() instead, in case hooks have modified the regions.
-            'regions': region_table,
-            'categories': category_table
+            # plain dicts, json.dumps can't serialize the lazy tables
+            'regions': dict(region_table),
+            'categories': dict(category_table)
         }
 
 ###
@@ -535,4 +594,7 @@ def add_client_to_launcher() -> None:
     if not discord_component:
         components.append(Component("Manual Discord Server", "ManualDiscord", func=lambda: webbrowser.open("https://discord.gg/hm4rQnTzQ5"), icon="discord", component_type=Type.ADJUSTER))
 
-add_client_to_launcher()
+with profile_stage("add_client_to_launcher"):
+    add_client_to_launcher()
+
+finish_import_profile()
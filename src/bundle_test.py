@@ -0,0 +1,135 @@
+import unittest
+from unittest.mock import patch
+
+from . import Data
+from .Bundle import BUNDLE_FILE, BUNDLE_FORMAT, SHARDS_FILE, SHARDS_HEADER, location_shards_match, prepare_item_table, \
+    prepare_location_table, read_bundle, read_location_shard, split_location_shards, update_id_map, write_bundle
+
+
+def song_shard_key(location: dict):
+    categories = location.get("category", [])
+    return categories[1] if "Goals" in categories else None
+
+def make_sharded_bundle() -> tuple[dict, bytes]:
+    bundle = {
+        "format": BUNDLE_FORMAT,
+        "source_hash": "current",
+        "data_sources": [],
+        "tables": {"locations.json": [
+            {"name": "Song A Clear", "id": 1, "category": ["Goals", "Song A"], "requires": "|Song A|"},
+            {"name": "Song B Clear", "id": 2, "category": ["Goals", "Song B"], "requires": "|Song B|"},
+            {"name": "Boss Clear", "id": 3, "category": ["Boss"], "requires": ""},
+        ]},
+    }
+    return bundle, split_location_shards(bundle, song_shard_key)
+
+def make_other_shards() -> tuple[dict, bytes]:
+    bundle = {"tables": {"locations.json": [{"name": "Song A Clear", "id": 10, "category": ["Goals", "Song A"]}]}}
+    return bundle, split_location_shards(bundle, song_shard_key)
+
+
+class TestLocationShards(unittest.TestCase):
+    def test_split_leaves_stubs(self):
+        bundle, _ = make_sharded_bundle()
+        self.assertEqual(bundle["tables"]["locations.json"], [
+            {"name": "Song A Clear", "id": 1, "_shard": "Song A"},
+            {"name": "Song B Clear", "id": 2, "_shard": "Song B"},
+            {"name": "Boss Clear", "id": 3, "category": ["Boss"], "requires": ""},
+        ])
+
+    def test_read_shard(self):
+        bundle, shards_file = make_sharded_bundle()
+        shard = read_location_shard(shards_file, bundle["location_shards"]["offsets"], "Song B")
+        self.assertEqual(shard, {"Song B Clear": {"name": "Song B Clear", "id": 2, "category": ["Goals", "Song B"], "requires": "|Song B|"}})
+
+    def test_header_matches_its_bundle(self):
+        bundle, shards_file = make_sharded_bundle()
+        self.assertTrue(location_shards_match(shards_file, bundle))
+
+    def test_header_rejects_other_files(self):
+        bundle, shards_file = make_sharded_bundle()
+        other_bundle, _ = make_other_shards()
+
+        self.assertFalse(location_shards_match(None, bundle))
+        self.assertFalse(location_shards_match(b"", bundle))
+        self.assertFalse(location_shards_match(shards_file[:SHARDS_HEADER.size - 1], bundle))
+        self.assertFalse(location_shards_match(shards_file[:-1], bundle), "truncated")
+        self.assertFalse(location_shards_match(b"NOTSHARD" + shards_file[8:], bundle), "wrong magic")
+        self.assertFalse(location_shards_match(shards_file, other_bundle), "another bundle's shards")
+
+
+class TestBundleFallback(unittest.TestCase):
+    def test_read_bundle_checks_format_and_hash(self):
+        data = write_bundle({"format": BUNDLE_FORMAT, "source_hash": "current", "data_sources": ["songs.json"]})
+        seen_sources = []
+        def expected_hash(data_sources):
+            seen_sources.append(data_sources)
+            return "current"
+
+        self.assertIsNotNone(read_bundle(data, expected_hash))
+        self.assertEqual(seen_sources, [["songs.json"]])
+        self.assertIsNone(read_bundle(data, lambda data_sources: "changed"))
+        self.assertIsNone(read_bundle(write_bundle({"format": BUNDLE_FORMAT - 1, "source_hash": "current"}), expected_hash))
+        self.assertIsNone(read_bundle(b"not a bundle", expected_hash))
+
+    def test_stale_bundle_loads_the_json_files(self):
+        stale = write_bundle({"format": BUNDLE_FORMAT, "source_hash": "stale", "data_sources": [], "tables": {}})
+        with patch.object(Data, "_read_package_file", return_value=stale), patch.object(Data, "_source_hash", return_value="current"):
+            self.assertEqual(Data._load_precompiled(BUNDLE_FILE), {})
+        with patch.object(Data, "_read_package_file", return_value=stale), patch.object(Data, "_source_hash", return_value="stale"):
+            self.assertEqual(Data._load_precompiled(BUNDLE_FILE)["source_hash"], "stale")
+
+    def test_bundle_with_other_shards_loads_the_json_files(self):
+        bundle, shards_file = make_sharded_bundle()
+        _, other_shards_file = make_other_shards()
+
+        for shards, expected in ((shards_file, True), (other_shards_file, False), (None, False)):
+            files = {BUNDLE_FILE: write_bundle(bundle), SHARDS_FILE: shards}
+            with patch.object(Data, "_read_package_file", side_effect=files.get), patch.object(Data, "_source_hash", return_value="current"), \
+                    patch.object(Data, "_location_shards_file", None):
+                self.assertEqual(bool(Data._load_bundle()), expected)
+
+
+def build_id_map(id_map: dict, songs: list[str]) -> dict:
+    """What scripts/build.py's save_id_map writes to ids.json for these songs"""
+    items = [{"name": song} for song in songs]
+    locations = [{"name": f"{song} Clear"} for song in songs]
+    prepare_item_table(items, 1, "Filler")
+    prepare_location_table(locations, 1)
+    return {"items": update_id_map(id_map.get("items", {}), items), "locations": update_id_map(id_map.get("locations", {}), locations)}
+
+def load_ids(id_map: dict, songs: list[str]) -> tuple[dict, dict]:
+    """The item and location ids the world gives these songs with this ids.json"""
+    items = [{"name": song} for song in songs]
+    locations = [{"name": f"{song} Clear"} for song in songs]
+    prepare_item_table(items, 1, "Filler", id_map["items"])
+    prepare_location_table(locations, 1, id_map["locations"])
+    return {item["name"]: item["id"] for item in items}, {location["name"]: location["id"] for location in locations}
+
+
+class TestIdMap(unittest.TestCase):
+    def test_ids_stay_across_a_rebuild(self):
+        first_map = build_id_map({}, ["Song A", "Song B", "Song C"])
+        first_items, first_locations = load_ids(first_map, ["Song A", "Song B", "Song C"])
+
+        # a song added at the start and one removed, which changes the position of every other one
+        songs = ["Song New", "Song A", "Song C"]
+        second_map = build_id_map(first_map, songs)
+        second_items, second_locations = load_ids(second_map, songs)
+
+        for song in ("Song A", "Song C"):
+            self.assertEqual(second_items[song], first_items[song])
+            self.assertEqual(second_locations[f"{song} Clear"], first_locations[f"{song} Clear"])
+        self.assertEqual(second_items["Filler"], first_items["Filler"])
+        self.assertEqual(second_items["Song New"], max(first_map["items"].values()) + 1)
+        self.assertEqual(second_map["items"]["Song B"], first_map["items"]["Song B"], "a removed name keeps its id")
+        self.assertNotIn(first_map["items"]["Song B"], second_items.values())
+
+    def test_names_missing_from_the_map_match_the_next_build(self):
+        id_map = build_id_map({}, ["Song A"])
+        songs = ["Song A", "Song New"]
+        self.assertEqual(load_ids(id_map, songs), load_ids(build_id_map(id_map, songs), songs))
+
+    def test_mapped_ids_must_be_unique(self):
+        with self.assertRaises(ValueError):
+            prepare_item_table([{"name": "Song A"}, {"name": "Song B", "id": 1}], 1, "", {"Song A": 1})
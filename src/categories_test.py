@@ -0,0 +1,64 @@
+import unittest
+
+from .Categories import clear_category_rules_cache, compile_category_rules, get_category_settings, is_exported_name_group
+
+
+def make_table() -> dict:
+    return {
+        "Goals": {"hidden": True, "name_group": False},
+        "Song Number *": {"match": "glob", "hidden": True, "name_group": False},
+        "^\\(Traps\\) .*$": {"match": "regex", "yaml_option": ["traps"]},
+        "Song Number 7": {"hidden": False},
+        "*": {"match": "glob", "name_group": True},
+    }
+
+
+class TestCategoryRules(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(clear_category_rules_cache)
+
+    def test_own_entry_then_first_matching_rule(self):
+        table = make_table()
+        self.assertEqual(get_category_settings(table, "Goals"), {"hidden": True, "name_group": False})
+        self.assertEqual(get_category_settings(table, "Song Number 12"), {"hidden": True, "name_group": False})
+        self.assertEqual(get_category_settings(table, "Song Number 7"), {"hidden": False}, "its own entry wins over the rules")
+        self.assertEqual(get_category_settings(table, "(Traps) Speed"), {"yaml_option": ["traps"]})
+        self.assertEqual(get_category_settings(table, "Score"), {"name_group": True})
+        self.assertEqual(get_category_settings({}, "Score"), {})
+        self.assertEqual(get_category_settings(None, "Score"), {})
+
+    def test_patterns_match_the_whole_name(self):
+        table = {"Song": {"match": "regex", "hidden": True}, "Nav?": {"match": "glob", "hidden": True}}
+        self.assertEqual(get_category_settings(table, "Song"), {"hidden": True})
+        self.assertEqual(get_category_settings(table, "Songs"), {})
+        self.assertEqual(get_category_settings(table, "Navs"), {"hidden": True})
+        self.assertEqual(get_category_settings(table, "Navs 2"), {})
+
+    def test_rule_keys_are_not_categories(self):
+        # a category named like a rule's pattern still goes through the rules
+        table = {"Song Number *": {"match": "glob", "hidden": True}}
+        self.assertEqual(get_category_settings(table, "Song Number *"), {"hidden": True})
+
+    def test_exported_name_groups(self):
+        table = make_table()
+        self.assertFalse(is_exported_name_group(table, "Song Number 3"))
+        self.assertTrue(is_exported_name_group(table, "Score"))
+        self.assertTrue(is_exported_name_group({}, "Score"))
+
+    def test_cache_follows_added_categories(self):
+        table = {"Song Number *": {"match": "glob", "hidden": True}}
+        self.assertEqual(get_category_settings(table, "Song Number 3"), {"hidden": True})
+        table["Song Number 3"] = {"hidden": False}
+        self.assertEqual(get_category_settings(table, "Song Number 3"), {"hidden": False})
+
+    def test_edits_in_place_need_a_clear(self):
+        table = {"Song Number *": {"match": "glob", "hidden": True}}
+        self.assertEqual(get_category_settings(table, "Song Number 3"), {"hidden": True})
+        table["Song Number *"]["hidden"] = False
+        self.assertEqual(get_category_settings(table, "Song Number 3"), {"hidden": True})
+        clear_category_rules_cache()
+        self.assertEqual(get_category_settings(table, "Song Number 3"), {"hidden": False})
+
+    def test_bad_pattern(self):
+        with self.assertRaises(ValueError):
+            compile_category_rules({"(unclosed": {"match": "regex"}})
@@ -0,0 +1,93 @@
+import json
+import pickle
+import unittest
+from itertools import chain
+
+from .Data import LazyDict, LazyList, LoadedDict, LoadedList, load_table, unload_table
+
+
+class TestLazyTables(unittest.TestCase):
+    def setUp(self):
+        self.loads = 0
+
+    def make_dict(self, on_load=None) -> LazyDict:
+        def load_dict():
+            self.loads += 1
+            return {"a": 1, "b": 2}
+        return LazyDict(load_dict, on_load)
+
+    def make_list(self, on_load=None) -> LazyList:
+        def load_list():
+            self.loads += 1
+            return [1, 2]
+        return LazyList(load_list, on_load)
+
+    def test_dict_loads_once_on_first_use(self):
+        table = self.make_dict()
+        self.assertEqual(self.loads, 0)
+        self.assertEqual(table["a"], 1)
+        self.assertEqual(table.get("b"), 2)
+        self.assertIsInstance(table, LoadedDict)
+        self.assertEqual(self.loads, 1)
+
+    def test_list_loads_once_on_first_use(self):
+        table = self.make_list()
+        self.assertEqual(self.loads, 0)
+        self.assertEqual(table[0], 1)
+        self.assertEqual(len(table), 2)
+        self.assertIsInstance(table, LoadedList)
+        self.assertEqual(self.loads, 1)
+
+    def test_dict_c_paths_load_it(self):
+        expected = {"a": 1, "b": 2}
+        self.assertEqual(dict(self.make_dict()), expected)
+        self.assertEqual({**self.make_dict()}, expected)
+        self.assertEqual({} | self.make_dict(), expected)
+        self.assertEqual(self.make_dict() | {}, expected)
+        self.assertEqual(self.make_dict(), expected)
+        self.assertEqual(expected, self.make_dict())
+        self.assertTrue(self.make_dict())
+        self.assertEqual(self.loads, 7)
+
+    def test_list_c_paths_load_it(self):
+        self.assertEqual([0] + self.make_list(), [0, 1, 2])
+        self.assertEqual(self.make_list() + [3], [1, 2, 3])
+        self.assertEqual(list(chain([0], self.make_list())), [0, 1, 2])
+        self.assertEqual([*self.make_list()], [1, 2])
+        self.assertEqual(sorted(self.make_list()), [1, 2])
+        self.assertEqual(self.make_list(), [1, 2])
+        self.assertEqual([1, 2], self.make_list())
+        extended = [0]
+        extended += self.make_list()
+        self.assertEqual(extended, [0, 1, 2])
+        self.assertEqual(self.loads, 8)
+
+    def test_tables_plus_each_other(self):
+        self.assertEqual(self.make_list() + self.make_list(), [1, 2, 1, 2])
+
+    def test_json_refuses_them(self):
+        for table in (self.make_dict(), self.make_list()):
+            with self.assertRaises(TypeError):
+                json.dumps(table)
+        self.assertEqual(json.loads(json.dumps(dict(self.make_dict()))), {"a": 1, "b": 2})
+        self.assertEqual(json.loads(json.dumps(list(self.make_list()))), [1, 2])
+
+    def test_pickles_as_plain_data(self):
+        self.assertIs(type(pickle.loads(pickle.dumps(self.make_dict()))), dict)
+        self.assertEqual(pickle.loads(pickle.dumps(self.make_list())), [1, 2])
+
+    def test_on_load_sees_the_loaded_table(self):
+        seen = []
+        table = self.make_list(lambda loaded: seen.append(len(loaded)))
+        self.assertIn(1, table)
+        self.assertEqual(seen, [2])
+
+    def test_load_and_unload(self):
+        table = self.make_dict()
+        load_table(table)
+        load_table(table)
+        self.assertEqual(self.loads, 1)
+        table["c"] = 3
+        unload_table(table)
+        self.assertNotIn("c", table)
+        self.assertEqual(self.loads, 2)
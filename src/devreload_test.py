@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import worlds
+from BaseClasses import ItemClassification
+
+from . import Data, DevReload, Helpers, ManualWorld
+from .Data import item_table
+
+NEW_ITEM = {"name": "Hot Reloaded Item", "category": ["Hot Reload"], "count": 1}
+
+
+@contextmanager
+def items_with_new_item():
+    """items.json with NEW_ITEM added, its bytes changed too so a precompiled bundle of the old one isn't used"""
+    parse_data_file, read_package_file = Helpers._parse_data_file, Data._read_package_file
+
+    def parse(fname):
+        data = parse_data_file(fname)
+        if fname == "data/items.json":
+            data = data.get("data", []) if isinstance(data, dict) else data
+            data = [*data, dict(NEW_ITEM)]
+        return data
+
+    def read(path):
+        data = read_package_file(path)
+        return data + b"\n" if path == "data/items.json" and data is not None else data
+
+    with patch.object(Helpers, "_parse_data_file", parse), patch.object(Data, "_read_package_file", read):
+        yield
+
+
+class TestDevReload(unittest.TestCase):
+    def setUp(self):
+        self.data_folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.data_folder.cleanup)
+        self.items_file = os.path.join(self.data_folder.name, "items.json")
+        with open(self.items_file, "w") as file:
+            file.write("[]")
+
+        for name, value in (("dev_reload_enabled", True), ("_data_folder", self.data_folder.name)):
+            patcher = patch.object(DevReload, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch.object(DevReload, "_last_snapshot", DevReload._snapshot())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # back to the tables of the real files
+        self.addCleanup(DevReload.reload_tables, ManualWorld)
+
+    def edit_items(self):
+        stat = os.stat(self.items_file)
+        os.utime(self.items_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_nothing_changed(self):
+        self.assertFalse(DevReload.reload_if_changed(ManualWorld))
+
+    def test_edit_to_items_is_picked_up(self):
+        old_checksum = worlds.network_data_package["games"].get(ManualWorld.game, {}).get("checksum")
+        self.assertNotIn(NEW_ITEM["name"], ManualWorld.item_name_to_id)
+
+        self.edit_items()
+        with items_with_new_item():
+            self.assertTrue(DevReload.reload_if_changed(ManualWorld))
+
+            self.assertIn(NEW_ITEM["name"], [item["name"] for item in item_table])
+            self.assertIn(NEW_ITEM["name"], ManualWorld.item_name_to_id)
+            self.assertIn(NEW_ITEM["name"], ManualWorld.item_names)
+            self.assertEqual(ManualWorld.item_id_to_name[ManualWorld.item_name_to_id[NEW_ITEM["name"]]], NEW_ITEM["name"])
+
+            data_package = worlds.network_data_package["games"][ManualWorld.game]
+            self.assertEqual(data_package, ManualWorld.get_data_package_data())
+            self.assertNotEqual(data_package["checksum"], old_checksum)
+            self.assertIn(NEW_ITEM["name"], data_package["item_name_to_id"])
+            self.assertEqual(data_package["item_name_groups"]["Hot Reload"], [NEW_ITEM["name"]])
+
+        self.assertFalse(DevReload.reload_if_changed(ManualWorld), "only reloads once per change")
+
+    def test_item_flags_apply_to_the_next_item(self):
+        world = ManualWorld.__new__(ManualWorld)
+        self.edit_items()
+        with items_with_new_item():
+            DevReload.reload_if_changed(ManualWorld)
+            self.assertEqual(world.get_item_template(NEW_ITEM["name"])[0], ItemClassification.filler)
+
+            ManualWorld.item_name_to_item[NEW_ITEM["name"]]["useful"] = True
+            self.assertEqual(world.get_item_template(NEW_ITEM["name"])[0], ItemClassification.useful)
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+from . import Helpers
+
+
+class TestDataFiles(unittest.TestCase):
+    def test_json_orjson_refuses(self):
+        # orjson refuses lone surrogates, json takes them
+        self.assertEqual(Helpers._parse_json(b'["\\ud800"]'), ["\ud800"])
+
+    def test_invalid_or_missing_file_is_empty(self):
+        with patch.object(Helpers, "_parse_data_file", side_effect=ValueError("invalid json")):
+            self.assertEqual(Helpers.load_data_file("items.json"), [])
+        self.assertEqual(Helpers.load_data_file("not a file.json"), [])
+
+    def test_other_errors_are_raised(self):
+        with patch.object(Helpers, "_parse_data_file", side_effect=RecursionError):
+            with self.assertRaises(RecursionError):
+                Helpers.load_data_file("items.json")
+
+    def test_apworld_is_opened_once(self):
+        with tempfile.TemporaryDirectory() as folder:
+            archive = os.path.join(folder, "test.apworld")
+            with zipfile.ZipFile(archive, "w") as zip_file:
+                zip_file.writestr("test/data/stored.json", '{"a": 1}', zipfile.ZIP_STORED)
+                zip_file.writestr("test/data/deflated.json", '[1, 2]', zipfile.ZIP_DEFLATED)
+
+            loader = type("Loader", (), {"archive": archive})()
+            with patch.object(Helpers, "__loader__", loader), patch.object(Helpers, "__file__", os.path.join(archive, "test", "Helpers.py")), \
+                    patch.object(Helpers, "_open_archive", Helpers.functools.cache(Helpers._open_archive.__wrapped__)) as open_archive:
+                self.assertEqual(Helpers._parse_data_file("data/stored.json"), {"a": 1})
+                self.assertEqual(Helpers._parse_data_file("data/deflated.json"), [1, 2])
+                with self.assertRaises(KeyError):
+                    Helpers._parse_data_file("data/missing.json")
+                self.assertEqual(open_archive.cache_info().misses, 1)
+                open_archive(archive)[0].close()
+                open_archive(archive)[1].close()
@@ -36,6 +36,18 @@ def after_load_option_file(option_table: dict) -> dict:
 def after_load_meta_file(meta_table: dict) -> dict:
     return meta_table
 
+# called by scripts/build.py for every location, after ids are assigned. Locations with the same key are stored together
+# and only loaded by the worlds that picked that key with select_location_shards (see hooks/World.py), or once
+# something uses the whole location_table. Return None to keep the location with the rest of the table
+def get_location_shard_key(location: dict) -> str | None:
+    categories: list[str] = location.get("category", [])
+
+    # song goals, the same locations before_is_location_enabled in hooks/Helpers.py enables per song
+    if "Goals" in categories:
+        return categories[1]
+
+    return None
+
 # called when an external tool (eg Universal Tracker) ask for slot data to be read
 # use this if you want to restore more data
 # return True if you want to trigger a regeneration if you changed anything
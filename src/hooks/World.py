@@ -12,7 +12,7 @@ from ..Locations import ManualLocation
 # Raw JSON data from the Manual apworld, respectively:
 #          data/game.json, data/items.json, data/locations.json, data/regions.json
 #
-from ..Data import convert_to_list, game_table, item_table, location_table, region_table
+from ..Data import convert_to_list, game_table, item_table, location_table, region_table, select_location_shards
 
 # These helper methods allow you to determine if an option has been set, or what its value is, for any player in the multiworld
 from ..Helpers import is_option_enabled, get_option_value, format_state_prog_items_key, ProgItemsCat, load_data_file
@@ -54,7 +54,7 @@ def before_create_regions(world: World, multiworld: MultiWorld, player: int):
         "enable_category_hinabitter_bandmeshi": "Hinabitter♪/BandMeshi♪",
     }
 
-    song_library: list[dict] = convert_to_list(load_data_file("songs.json"), 'data')
+    song_library: list[dict] = convert_to_list(load_data_file("songs.json", read_only=True), 'data')
 
     playable_songs: list[dict] = []
     boss_songs: list[str] = []
@@ -74,7 +74,7 @@ def before_create_regions(world: World, multiworld: MultiWorld, player: int):
         else:
             playable_songs.append(song)
 
-    navigator_song_names: dict[str, list[str]] = load_data_file("navigators.json")
+    navigator_song_names: dict[str, list[str]] = load_data_file("navigators.json", read_only=True)
     allowed_navigator_songs: dict[str, list[str]] = {}
     for navigator in navigator_song_names:
         allowed_navigator_songs[navigator] = []
@@ -135,6 +135,10 @@ def before_create_regions(world: World, multiworld: MultiWorld, player: int):
     # print("\n".join(chosen_boss_songs), len(chosen_boss_songs))
     PLAYER_SONG_LISTS[player].extend(chosen_boss_songs)
 
+    # the goals of the other songs are disabled by before_is_location_enabled, so this world doesn't need to load them
+    if not hasattr(multiworld, "generation_is_fake"):
+        select_location_shards(world, PLAYER_SONG_LISTS[player])
+
 
 
 # Called after regions and locations are created, in case you want to see or modify that information. Victory location is included.
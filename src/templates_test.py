@@ -0,0 +1,55 @@
+import unittest
+
+from .Templates import expand_location_templates, get_template_sources
+
+ROWS = [
+    {"identifier": "Song A", "number": 0, "kind": "song", "navigators": ["RASIS", "GRACE"]},
+    {"identifier": "Song B", "number": 1, "kind": "boss", "navigators": []},
+]
+
+
+def expand(*patterns: dict) -> list[dict]:
+    locations = [{"name": "Fixed"}, {"template": {"source": "song_goals.json", "locations": list(patterns)}}]
+    return expand_location_templates(locations, lambda filename: {"data": ROWS} if filename == "song_goals.json" else [])
+
+
+class TestLocationTemplates(unittest.TestCase):
+    def test_sources(self):
+        self.assertEqual(get_template_sources([{"name": "Fixed"}, {"template": {"source": "song_goals.json"}}]), ["song_goals.json"])
+
+    def test_where_and_for_each(self):
+        locations = expand({"where": {"kind": "song"}, "for_each": {"goal": ["Clear", "AA"]}, "name": "{identifier} ({goal})", "requires": "|@Song Number {number}|"})
+        self.assertEqual(locations, [
+            {"name": "Fixed"},
+            {"name": "Song A (Clear)", "requires": "|@Song Number 0|"},
+            {"name": "Song A (AA)", "requires": "|@Song Number 0|"},
+        ])
+
+    def test_each_in_lists_and_strings(self):
+        locations = expand({
+            "where": {"kind": "song"},
+            "name": "{identifier}",
+            "category": ["Goals", {"each": "navigators", "as": "navigator", "format": "({navigator}) {identifier}"}],
+            "requires": {"each": "navigators", "format": "|{navigators}|", "join": " or "},
+        })
+        self.assertEqual(locations[1]["category"], ["Goals", "(RASIS) Song A", "(GRACE) Song A"])
+        self.assertEqual(locations[1]["requires"], "|RASIS| or |GRACE|")
+
+    def test_nested_dicts_are_filled_and_copied(self):
+        locations = expand({
+            "name": "{identifier}",
+            "value": {"chain": "{number}", "songs": ["{identifier}"]},
+            "place_item": [{"item": "{identifier} (Completion)"}],
+        })
+        song_a, song_b = locations[1:]
+        self.assertEqual(song_a["value"], {"chain": "0", "songs": ["Song A"]})
+        self.assertEqual(song_b["value"], {"chain": "1", "songs": ["Song B"]})
+        self.assertEqual(song_b["place_item"], [{"item": "Song B (Completion)"}])
+
+        song_a["value"]["chain"] = "changed"
+        self.assertEqual(song_b["value"]["chain"], "1")
+        self.assertIsNot(song_a["place_item"][0], song_b["place_item"][0])
+
+    def test_unknown_field(self):
+        with self.assertRaises(ValueError):
+            expand({"name": "{title}"})
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import Future
+from unittest.mock import patch
+
+from . import DataValidation as DataValidationModule
+from .Data import LazyDict, LazyList, LoadedDict, LoadedList
+from .DataValidation import DataValidation, GENERATION_CHECKS, VALIDATION_CACHE_FILE, VALIDATION_WORKERS_ENV_VAR, \
+    _readValidationInputs, _runGenerationChecks, runGenerationDataValidation
+
+
+class RecordingExecutor:
+    """A ProcessPoolExecutor that runs nothing, it records which tables were loaded when the pool started"""
+    loaded_at_start = None
+
+    def __init__(self, max_workers, mp_context):
+        RecordingExecutor.loaded_at_start = {
+            name: isinstance(getattr(DataValidation, name), (LoadedDict, LoadedList))
+            for name in ("game_table", "item_table", "location_table", "region_table", "category_table")
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result((None, 0.0))
+        return future
+
+
+class TestValidationProcesses(unittest.TestCase):
+    def setUp(self):
+        tables = {
+            "game_table": LazyDict(lambda: {"game": "Test"}),
+            "item_table": LazyList(lambda: [{"name": "Item"}]),
+            "location_table": LazyList(lambda: [{"name": "Location"}]),
+            "region_table": LazyDict(lambda: {}),
+            "category_table": LazyDict(lambda: {}),
+        }
+        for name, table in tables.items():
+            patcher = patch.object(DataValidation, name, table)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "the checks only run in processes where fork is available")
+    def test_tables_load_before_the_processes_start(self):
+        with patch.dict(os.environ, {VALIDATION_WORKERS_ENV_VAR: "2"}), \
+                patch.object(DataValidationModule, "ProcessPoolExecutor", RecordingExecutor):
+            validation_errors = []
+            _runGenerationChecks(validation_errors)
+
+        self.assertEqual(validation_errors, [])
+        self.assertEqual(RecordingExecutor.loaded_at_start, {
+            "game_table": True, "item_table": True, "location_table": True, "region_table": True, "category_table": True,
+        })
+
+    def test_checks_run_here_by_default(self):
+        with patch.dict(os.environ, {VALIDATION_WORKERS_ENV_VAR: ""}), \
+                patch.object(DataValidationModule, "_runCheck", return_value=(None, 0.0)) as run_check:
+            _runGenerationChecks([])
+        self.assertEqual([call.args[0] for call in run_check.call_args_list], GENERATION_CHECKS)
+
+
+class TestValidationCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_folder.cleanup)
+        patcher = patch.object(DataValidationModule.Utils, "cache_path", lambda *path: os.path.join(self.cache_folder.name, *path))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch.object(DataValidationModule, "_validateGenerationData")
+        self.validate = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_code_hooks_and_data_are_inputs(self):
+        inputs = _readValidationInputs()
+        for path in ("DataValidation.py", "Helpers.py", "Rules.py", "hooks/Data.py", "hooks/World.py", "data/items.json", "data/songs.json"):
+            self.assertIn(path, inputs)
+
+    def test_unchanged_inputs_validate_once(self):
+        runGenerationDataValidation()
+        runGenerationDataValidation()
+        self.assertEqual(self.validate.call_count, 1)
+        self.assertEqual(os.listdir(self.cache_folder.name), [VALIDATION_CACHE_FILE])
+
+    def test_changed_input_validates_again(self):
+        inputs = _readValidationInputs()
+        runGenerationDataValidation()
+
+        for path in ("Helpers.py", "hooks/World.py", "data/songs.json"):
+            changed = {**inputs, path: inputs[path] + b"\n"}
+            with patch.object(DataValidationModule, "_readValidationInputs", return_value=changed):
+                runGenerationDataValidation()
+        self.assertEqual(self.validate.call_count, 4)
+
+        with patch.object(DataValidationModule.Utils, "__version__", "another version"):
+            runGenerationDataValidation()
+        self.assertEqual(self.validate.call_count, 5)
+
+        runGenerationDataValidation()
+        self.assertEqual(self.validate.call_count, 5, "the original inputs are still in the cache")